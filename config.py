@@ -112,6 +112,23 @@ CLICK_SOUND_PATH = "assets/sounds/click.wav"
 GAME_MODE = "self" # "self" or "computer"
 GAME_TIME_MODE = "classic" # "classic", "3m", "5m", "10m"
 
+# AI Settings
+AI_ENGINE = "minimax" # "minimax" (alpha-beta) or "mcts" (Monte Carlo Tree Search)
+AI_MCTS_EXPLORATION = 1.4 # UCT exploration constant for the MCTS engine
+AI_TT_SIZE_MB = 16 # Transposition table memory budget
+AI_MAX_DEPTH = 10 # Iterative deepening depth cap
+AI_MOVE_TIME_MS = 1500 # Thinking time per move (timed modes use less when the clock runs low)
+AI_WORKERS = 1 # Processes for root-parallel search, 1 searches in-process
+AI_PONDER = True # Search likely replies while the player thinks
+AI_LOG_SEARCH = False # Print a statistics line (depth, nodes, nps, TT, PV) for each move the AI plays
+
+# Win Probability Bar
+PROBABILITY_TOLERANCE = 0.04 # Stop simulating once the 95% interval is within +/- this
+PROBABILITY_TIME_SLICE_MS = 500 # Most time spent evaluating one position
+PROBABILITY_MAX_SIMULATIONS = 2000
+PROBABILITY_WORKERS = 1 # Processes for rollouts, 1 simulates in-process
+PROBABILITY_CACHE_MB = 4 # Rollout counts kept for positions seen before
+
 # Audio Settings
 MUSIC_VOLUME = 0.6
 MUSIC_ENABLED = True
@@ -0,0 +1,66 @@
+"""
+Common base of the AI engines
+What the game, the background search task and the ponderer expect from any
+engine: get_best_move on top of search(), a lock held while a background
+thread searches, the SearchStats of the last search with an optional hook,
+and the periodic deadline/cancel check.
+"""
+
+import threading
+import time
+
+
+class SearchAI:
+    """
+    Subclasses implement search(logic_state, deadline, cancel), returning
+    their SearchStats through finish_search().
+    """
+
+    def __init__(self):
+        # Held for the duration of a search run from a background thread
+        self.search_lock = threading.Lock()
+        # SearchStats of the last search, and an optional callable that gets each one
+        self.last_stats = None
+        self.on_search = None
+        # Off while searching for something other than the move to play
+        # (pondering): stats are still returned, but not kept or passed on
+        self.publish_stats = True
+
+    def get_best_move(self, logic_state, deadline=None, cancel=None):
+        """
+        Search logic_state and return the move to play.
+
+        Args:
+            logic_state: UltimateTicTacToeLogic or Position (not modified)
+            deadline: time.perf_counter() value to stop at, or None for no limit
+            cancel: threading.Event that stops the search when set, or None
+
+        Returns:
+            tuple: (board_idx, row, col), None if there is no legal move
+        """
+        return self.search(logic_state, deadline, cancel).move
+
+    def search(self, logic_state, deadline=None, cancel=None):
+        """get_best_move, returning the full SearchStats of the search."""
+        raise NotImplementedError
+
+    def finish_search(self, stats):
+        """Keep stats as last_stats and pass them to the on_search hook, if publishing."""
+        if not self.publish_stats:
+            return stats
+        self.last_stats = stats
+        if self.on_search is not None:
+            self.on_search(stats)
+        return stats
+
+    @staticmethod
+    def should_stop(deadline, cancel):
+        """Deadline passed or search cancelled. Call every few thousand nodes."""
+        if deadline is not None and time.perf_counter() >= deadline:
+            return True
+        if cancel is not None:
+            if cancel.is_set():
+                return True
+            # Running in a worker thread: give the frame loop a turn at the GIL
+            time.sleep(0)
+        return False
@@ -0,0 +1,243 @@
+"""
+Monte Carlo Tree Search AI for Ultimate Tic-Tac-Toe
+UCT search with random playouts. The tree is stored in flat typed arrays
+(one slot per node, children of a node in one contiguous block) instead of
+one Python object per edge, and the subtree under the moves actually
+played is kept from one turn to the next.
+"""
+
+import math
+import random
+import time
+from array import array
+
+from engine.ai_base import SearchAI
+from engine.search_stats import SearchStats
+from engine.ultimate_logic import as_logic
+
+# Iterations between deadline/cancel checks
+CHECK_INTERVAL = 64
+
+
+class MCTSAI(SearchAI):
+    def __init__(self, iterations=None, exploration=1.4, max_nodes=500000):
+        """
+        Args:
+            iterations: Playouts per move, or None to run until the deadline
+            exploration: UCT exploration constant
+            max_nodes: Tree size limit; leaves are no longer expanded beyond it
+        """
+        super().__init__()
+        self.iterations = iterations
+        self.exploration = exploration
+        self.max_nodes = max_nodes
+        self.node_count = 0
+        self.reused_visits = 0
+        self.reset_tree()
+
+    def reset_tree(self):
+        # Node arrays. move: board_idx * 9 + cell of the move into the node,
+        # mover: player (0 = X, 1 = O) who made that move, wins: score for mover
+        self.move = array("b", [-1])
+        self.mover = array("b", [-1])
+        self.parent = array("i", [-1])
+        self.first_child = array("i", [-1])
+        self.child_count = array("b", [0])
+        self.visits = array("i", [0])
+        self.wins = array("d", [0.0])
+        self.root = 0
+        # Position the tree root stands for, to find it again next turn
+        self.root_key = None
+        self.root_ply = 0
+
+    def tree_size(self):
+        return len(self.move)
+
+    def search(self, logic_state, deadline=None, cancel=None):
+        """
+        Run playouts from logic_state; stats.move is the most visited move.
+        score is the win rate of the chosen move, nodes the playouts run.
+        """
+        start_time = time.perf_counter()
+        state = as_logic(logic_state).copy()
+        if state.game_over:
+            return self.finish_search(SearchStats("mcts"))
+        self.advance_root(state)
+        self.node_count = 0
+
+        if self.iterations is None and deadline is None:
+            # Neither budget given: fall back to a fixed amount of work
+            iterations = 2000
+        else:
+            iterations = self.iterations
+
+        while iterations is None or self.node_count < iterations:
+            if self.node_count % CHECK_INTERVAL == 0 and self.node_count:
+                if self.should_stop(deadline, cancel):
+                    break
+            self.iterate(state)
+            self.node_count += 1
+
+        best = self.best_child(self.root)
+        if best == -1:
+            return self.finish_search(SearchStats("mcts"))
+        self.root_key = state.zobrist_key
+        self.root_ply = len(state.history)
+        pv = self.principal_variation()
+        stats = SearchStats(
+            "mcts", pv[0], round(self.wins[best] / max(1, self.visits[best]), 3), len(pv),
+            self.node_count, (time.perf_counter() - start_time) * 1000, pv=pv,
+            details={"reused": self.reused_visits, "tree": self.tree_size()})
+        return self.finish_search(stats)
+
+    def principal_variation(self):
+        """Moves along the most visited children from the root."""
+        pv = []
+        node = self.best_child(self.root)
+        while node != -1:
+            board_idx, cell = divmod(self.move[node], 9)
+            pv.append((board_idx, cell // 3, cell % 3))
+            node = self.best_child(node)
+        return pv
+
+    def advance_root(self, state):
+        """Move the root down to state along the moves played since the last search, or start over."""
+        self.reused_visits = 0
+        if self.root_key is not None and len(state.history) >= self.root_ply:
+            probe = state.copy()
+            played = []
+            while len(probe.history) > self.root_ply:
+                board_idx, cell = probe.history[-1][:2]
+                played.append(board_idx * 9 + cell)
+                probe.unmake_move()
+            if probe.zobrist_key == self.root_key:
+                node = self.root
+                for code in reversed(played):
+                    node = self.find_child(node, code)
+                    if node == -1:
+                        break
+                if node != -1:
+                    self.compact(node)
+                    self.reused_visits = self.visits[0]
+                    return
+        self.reset_tree()
+
+    def find_child(self, node, code):
+        first = self.first_child[node]
+        for child in range(first, first + self.child_count[node]):
+            if self.move[child] == code:
+                return child
+        return -1
+
+    def compact(self, new_root):
+        """Keep only the subtree under new_root, copied to the front of fresh arrays."""
+        move = array("b", [self.move[new_root]])
+        mover = array("b", [self.mover[new_root]])
+        parent = array("i", [-1])
+        first_child = array("i", [-1])
+        child_count = array("b", [self.child_count[new_root]])
+        visits = array("i", [self.visits[new_root]])
+        wins = array("d", [self.wins[new_root]])
+
+        queue = [(new_root, 0)]
+        for old, new in queue:
+            count = self.child_count[old]
+            if not count:
+                continue
+            old_first = self.first_child[old]
+            new_first = len(move)
+            first_child[new] = new_first
+            for k in range(count):
+                child = old_first + k
+                move.append(self.move[child])
+                mover.append(self.mover[child])
+                parent.append(new)
+                first_child.append(-1)
+                child_count.append(self.child_count[child])
+                visits.append(self.visits[child])
+                wins.append(self.wins[child])
+                queue.append((child, new_first + k))
+
+        self.move, self.mover, self.parent = move, mover, parent
+        self.first_child, self.child_count = first_child, child_count
+        self.visits, self.wins = visits, wins
+        self.root = 0
+
+    def iterate(self, state):
+        """One selection / expansion / playout / backpropagation pass. Leaves state unchanged."""
+        base_ply = len(state.history)
+        node = self.root
+
+        # Selection
+        while self.child_count[node] and not state.game_over:
+            node = self.select_child(node)
+            board_idx, cell = divmod(self.move[node], 9)
+            state.make_move(board_idx, cell // 3, cell % 3)
+
+        # Expansion: add every child at once, then play the first (they are shuffled)
+        if not state.game_over and len(self.move) < self.max_nodes:
+            moves = state.get_legal_moves()
+            random.shuffle(moves)
+            mover = 0 if state.current_turn == "X" else 1
+            first = len(self.move)
+            self.first_child[node] = first
+            self.child_count[node] = len(moves)
+            for board_idx, r, c in moves:
+                self.move.append(board_idx * 9 + r * 3 + c)
+                self.mover.append(mover)
+                self.parent.append(node)
+                self.first_child.append(-1)
+                self.child_count.append(0)
+                self.visits.append(0)
+                self.wins.append(0.0)
+            node = first
+            board_idx, r, c = moves[0]
+            state.make_move(board_idx, r, c)
+
+        # Playout
+        while not state.game_over:
+            board_idx, r, c = random.choice(state.get_legal_moves())
+            state.make_move(board_idx, r, c)
+        winner = state.winner
+        while len(state.history) > base_ply:
+            state.unmake_move()
+
+        # Backpropagation
+        win_player = 0 if winner == "X" else 1 if winner == "O" else -1
+        visits, wins, mover, parent = self.visits, self.wins, self.mover, self.parent
+        while node != -1:
+            visits[node] += 1
+            if win_player == -1:
+                wins[node] += 0.5
+            elif mover[node] == win_player:
+                wins[node] += 1.0
+            node = parent[node]
+
+    def select_child(self, node):
+        """UCT: best win rate plus exploration bonus, unvisited children first."""
+        first = self.first_child[node]
+        visits, wins = self.visits, self.wins
+        log_n = math.log(visits[node] or 1)
+        c = self.exploration
+        best = first
+        best_value = -1.0
+        for child in range(first, first + self.child_count[node]):
+            n = visits[child]
+            if not n:
+                return child
+            value = wins[child] / n + c * math.sqrt(log_n / n)
+            if value > best_value:
+                best_value = value
+                best = child
+        return best
+
+    def best_child(self, node):
+        """Most visited child, or -1 if the node was never expanded."""
+        first = self.first_child[node]
+        best = -1
+        best_visits = -1
+        for child in range(first, first + self.child_count[node]):
+            if self.visits[child] > best_visits:
+                best_visits = self.visits[child]
+                best = child
+        return best
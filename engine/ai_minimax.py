@@ -1,37 +1,195 @@
-
-import copy
 import random
+import time
+from engine.ai_base import SearchAI
+from engine.bitboard import BOARD_CODES, CELL_BITS, EMPTY_CELLS, IS_WIN, TERNARY
+from engine.search_stats import SearchStats
+from engine.transposition import EXACT, LOWER, UPPER, TranspositionTable
+from engine.ultimate_logic import as_logic
 
 WIN_SCORE = 10000
 SMALL_WIN_SCORE = 100
 BLOCK_SCORE = 50
 CENTER_SCORE = 10
 
-class MinimaxAI:
-    def __init__(self, depth=4):
+# Evaluation weights: value of an open line holding two or one marks of a
+# player, and the factor applied to lines of the big board. Integers, so
+# scores fit the transposition table.
+DEFAULT_WEIGHTS = {"two": 10, "one": 1, "big_board": 10}
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the deadline passes or the search is cancelled."""
+
+
+class MinimaxAI(SearchAI):
+    # Nodes between deadline checks
+    CHECK_INTERVAL = 1024
+
+    def __init__(self, depth=4, tt_size_mb=16, weights=None):
+        """
+        Args:
+            depth: Iterative deepening depth cap
+            tt_size_mb: Transposition table memory budget
+            weights: Overrides of DEFAULT_WEIGHTS, e.g. {"two": 12}; integers
+        """
+        super().__init__()
         self.max_depth = depth
         self.node_count = 0
+        self.depth_reached = 0
+        self.deadline = None
+        self.cancel = None
+        self.tt = TranspositionTable(tt_size_mb)
+        unknown = set(weights or ()) - set(DEFAULT_WEIGHTS)
+        if unknown:
+            raise ValueError(f"Unknown evaluation weights: {sorted(unknown)}")
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        fractional = {name: value for name, value in self.weights.items() if not isinstance(value, int)}
+        if fractional:
+            raise ValueError(f"Evaluation weights must be integers, so scores fit the transposition table: {fractional}")
+        self.o_line_score, self.x_line_score, self.board_score = eval_tables(self.weights["two"], self.weights["one"])
+        self.big_weight = self.weights["big_board"]
 
-    def get_best_move(self, logic_state):
-        self.node_count = 0
-        # Clone state to avoid mutating actual game
-        # Note: logic_state needs to be pickle-able or explicitly copyable. 
-        # Deepcopy is safest but slow. For UTTT it might be okay for depth 4.
-        root_state = copy.deepcopy(logic_state)
-        
-        best_score = -float('inf')
-        best_move = None
+        # Incremental evaluation: open small boards and big board parts, plus undo stack
+        self.eval_small = 0
+        self.eval_big = 0
+        self.eval_stack = []
+
+        # Move ordering state
+        self.root_depth = 0
+        self.killers = [[None, None] for _ in range(depth + 1)]
+        # history[player][board_idx * 9 + cell], raised on every beta cutoff
+        self.history = [[0] * 81, [0] * 81]
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        # TT counters at the start of the search, to report this search's hit rate
+        self.tt_hits_start = 0
+        self.tt_misses_start = 0
+
+    def tt_stats(self):
+        """Hit/miss/collision counters of the transposition table."""
+        return self.tt.stats()
+
+    def first_move_cutoff_rate(self):
+        """Share of beta cutoffs produced by the first move tried (1.0 = perfect ordering)."""
+        if not self.beta_cutoffs:
+            return 0.0
+        return self.first_move_cutoffs / self.beta_cutoffs
+
+    def search(self, logic_state, deadline=None, cancel=None):
+        """
+        Iterative deepening search up to max_depth. stats.move is the best
+        move of the last completed iteration, None if there is no legal move.
+        """
+        start_time = time.perf_counter()
+        # Search mutates one private copy in place via make_move/unmake_move
+        root_state = as_logic(logic_state).copy()
+        self.begin_search(root_state, deadline, cancel)
         
         # Get all legal moves
         moves = self.get_legal_moves(root_state)
         
         # If no moves, return None
         if not moves:
-            return None
+            return self.finish_search(SearchStats("minimax"))
             
         # Shuffle moves to add variety if scores are equal
         random.shuffle(moves)
 
+        best_move = moves[0]
+        best_score = 0
+        iteration_nodes = []
+        for depth in range(1, self.max_depth + 1):
+            nodes_before = self.node_count
+            try:
+                move, score = self.search_root(root_state, moves, depth)
+            except SearchTimeout:
+                # Partial iteration is discarded (root_state is left mid-line), keep the previous result
+                break
+            best_move, best_score = move, score
+            self.depth_reached = depth
+            iteration_nodes.append(self.node_count - nodes_before)
+
+            # A forced win or loss will not change with more depth
+            if abs(best_score) >= WIN_SCORE:
+                break
+            # The next iteration costs several times this one, don't start what can't finish
+            if deadline is not None:
+                now = time.perf_counter()
+                if now + (now - start_time) * 2 >= deadline:
+                    break
+
+        stats = SearchStats(
+            "minimax", best_move, best_score, self.depth_reached, self.node_count,
+            (time.perf_counter() - start_time) * 1000, self.search_tt_hit_rate(),
+            self.beta_cutoffs, self.first_move_cutoffs, iteration_nodes)
+        # After the hit rate: walking the PV probes the TT too
+        stats.pv = self.principal_variation(as_logic(logic_state).copy(), best_move, self.depth_reached)
+        return self.finish_search(stats)
+
+    def search_tt_hit_rate(self):
+        """TT hit rate since begin_search."""
+        hits = self.tt.hits - self.tt_hits_start
+        probes = hits + self.tt.misses - self.tt_misses_start
+        return hits / probes if probes else 0.0
+
+    def principal_variation(self, state, first_move, length):
+        """
+        Expected line of play: first_move, then the TT best move of each
+        following position while it is legal. state is modified.
+        """
+        pv = []
+        move = first_move
+        while move is not None and len(pv) < max(length, 1):
+            pv.append(move)
+            state.make_move(*move)
+            if state.game_over:
+                break
+            entry = self.tt.probe(state.zobrist_key)
+            move = entry[3] if entry else None
+            if move is not None and move not in self.get_legal_moves(state):
+                move = None
+        return pv
+
+    def begin_search(self, root_state, deadline=None, cancel=None, new_root=True):
+        """
+        Reset counters and limits for a search from root_state. With
+        new_root, also age the TT and reset killers and decay history; a
+        caller searching the same root again in parts passes False so
+        the earlier parts' entries and ordering statistics are kept.
+        """
+        self.node_count = 0
+        self.depth_reached = 0
+        self.deadline = deadline
+        self.cancel = cancel
+        self.tt_hits_start = self.tt.hits
+        self.tt_misses_start = self.tt.misses
+        self.beta_cutoffs = 0
+        self.first_move_cutoffs = 0
+        if new_root:
+            self.tt.new_search()
+            # Killers are tied to the previous root, history only decays
+            self.killers = [[None, None] for _ in range(self.max_depth + 1)]
+            for table in self.history:
+                for i in range(81):
+                    table[i] >>= 2
+        self.reset_eval(root_state)
+
+    def search_root(self, root_state, moves, depth):
+        """
+        Search all root moves to a fixed depth for the side to move.
+        Returns (best_move, best_score), the score from O's side.
+        """
+        # Best move of an earlier iteration or search of this position goes first
+        root_key = root_state.zobrist_key
+        entry = self.tt.probe(root_key)
+        if entry and entry[3] in moves:
+            moves.remove(entry[3])
+            moves.insert(0, entry[3])
+
+        self.root_depth = depth
+        # Scores are always from O's side: O maximises, X minimises
+        maximizing = root_state.current_turn == "O"
+        best_score = -float('inf') if maximizing else float('inf')
+        best_move = None
         alpha = -float('inf')
         beta = float('inf')
 
@@ -39,22 +197,27 @@ class MinimaxAI:
             board_idx, r, c = move
             
             # Simulate move
-            next_state = copy.deepcopy(root_state)
-            next_state.make_move(board_idx, r, c)
+            self.make(root_state, board_idx, r, c)
+            score = self.minimax(root_state, depth - 1, alpha, beta, not maximizing)
+            self.unmake(root_state)
             
-            score = self.minimax(next_state, self.max_depth - 1, alpha, beta, False)
-            
-            if score > best_score:
+            if maximizing:
+                if score > best_score:
+                    best_score = score
+                    best_move = move
+                alpha = max(alpha, best_score)
+            elif score < best_score:
                 best_score = score
                 best_move = move
-                
-            alpha = max(alpha, best_score)
+                beta = min(beta, best_score)
             
-        print(f"AI Selected Move: {best_move} Score: {best_score} Nodes: {self.node_count}")
-        return best_move
+        self.tt.store(root_key, depth, EXACT, best_score, best_move)
+        return best_move, best_score
 
     def minimax(self, state, depth, alpha, beta, is_maximizing):
         self.node_count += 1
+        if self.node_count % self.CHECK_INTERVAL == 0 and self.should_stop(self.deadline, self.cancel):
+            raise SearchTimeout()
         
         # Terminal conditions or max depth
         if state.game_over:
@@ -66,36 +229,113 @@ class MinimaxAI:
                 return 0 # Draw
                 
         if depth == 0:
-            return self.evaluate(state)
+            # Maintained incrementally by make/unmake
+            return self.eval_small + self.eval_big
+
+        # Transposition table: reuse scores of positions reached by another move order
+        key = state.zobrist_key
+        alpha_orig = alpha
+        beta_orig = beta
+        tt_move = None
+        entry = self.tt.probe(key)
+        if entry:
+            tt_depth, bound, tt_score, tt_move = entry
+            if tt_depth >= depth:
+                if bound == EXACT:
+                    return tt_score
+                if bound == LOWER:
+                    alpha = max(alpha, tt_score)
+                else:
+                    beta = min(beta, tt_score)
+                if beta <= alpha:
+                    return tt_score
             
-        moves = self.get_legal_moves(state)
+        ply = self.root_depth - depth
+        moves = self.order_moves(state, self.get_legal_moves(state), tt_move, ply)
+        best_move = None
         
         if is_maximizing:
-            max_eval = -float('inf')
-            for move in moves:
+            best_eval = -float('inf')
+            for i, move in enumerate(moves):
                 board_idx, r, c = move
-                next_state = copy.deepcopy(state)
-                next_state.make_move(board_idx, r, c)
-                
-                eval = self.minimax(next_state, depth-1, alpha, beta, False)
-                max_eval = max(max_eval, eval)
+                self.make(state, board_idx, r, c)
+                eval = self.minimax(state, depth-1, alpha, beta, False)
+                self.unmake(state)
+                if eval > best_eval:
+                    best_eval = eval
+                    best_move = move
                 alpha = max(alpha, eval)
                 if beta <= alpha:
+                    self.record_cutoff(state, move, depth, ply, i)
                     break
-            return max_eval
         else:
-            min_eval = float('inf')
-            for move in moves:
+            best_eval = float('inf')
+            for i, move in enumerate(moves):
                 board_idx, r, c = move
-                next_state = copy.deepcopy(state)
-                next_state.make_move(board_idx, r, c)
-                
-                eval = self.minimax(next_state, depth-1, alpha, beta, True)
-                min_eval = min(min_eval, eval)
+                self.make(state, board_idx, r, c)
+                eval = self.minimax(state, depth-1, alpha, beta, True)
+                self.unmake(state)
+                if eval < best_eval:
+                    best_eval = eval
+                    best_move = move
                 beta = min(beta, eval)
                 if beta <= alpha:
+                    self.record_cutoff(state, move, depth, ply, i)
                     break
-            return min_eval
+
+        if best_eval <= alpha_orig:
+            bound = UPPER
+        elif best_eval >= beta_orig:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.tt.store(key, depth, bound, best_eval, best_move)
+        return best_eval
+
+    def order_moves(self, state, moves, tt_move, ply):
+        """
+        Sort moves best-first: TT/PV move, board-capturing moves,
+        killer moves of this ply, then by history score.
+        """
+        player = 0 if state.current_turn == "X" else 1
+        own_masks = state.masks[player]
+        history = self.history[player]
+        killers = self.killers[ply] if ply < len(self.killers) else (None, None)
+
+        def move_score(move):
+            if move == tt_move:
+                return 1 << 30
+            board_idx, r, c = move
+            cell = r * 3 + c
+            if IS_WIN[own_masks[board_idx] | CELL_BITS[cell]]:
+                return 1 << 29
+            if move == killers[0]:
+                return 1 << 28
+            if move == killers[1]:
+                return (1 << 28) - 1
+            return history[board_idx * 9 + cell]
+
+        moves.sort(key=move_score, reverse=True)
+        return moves
+
+    def record_cutoff(self, state, move, depth, ply, move_number):
+        """Update killers, history and cutoff counters after a beta cutoff."""
+        self.beta_cutoffs += 1
+        if move_number == 0:
+            self.first_move_cutoffs += 1
+
+        board_idx, r, c = move
+        cell = r * 3 + c
+        player = 0 if state.current_turn == "X" else 1
+        # Captures are already ordered early, only quiet moves become killers
+        if IS_WIN[state.masks[player][board_idx] | CELL_BITS[cell]]:
+            return
+        if ply < len(self.killers):
+            killers = self.killers[ply]
+            if killers[0] != move:
+                killers[1] = killers[0]
+                killers[0] = move
+        self.history[player][board_idx * 9 + cell] += depth * depth
 
     def get_legal_moves(self, state):
         moves = []
@@ -104,41 +344,71 @@ class MinimaxAI:
         target_boards = []
         if state.next_board_index == -1:
             for i in range(9):
-                if state.board_states[i] == "":
+                if not state.closed & CELL_BITS[i]:
                     target_boards.append(i)
         else:
             # Must play in specific board if active
-            if state.board_states[state.next_board_index] == "":
+            if not state.closed & CELL_BITS[state.next_board_index]:
                 target_boards.append(state.next_board_index)
             else:
                 # Fallback (should be covered by -1 logic, but just in case)
                  for i in range(9):
-                    if state.board_states[i] == "":
+                    if not state.closed & CELL_BITS[i]:
                         target_boards.append(i)
 
         for b_idx in target_boards:
-            for r in range(3):
-                for c in range(3):
-                    if state.small_boards[b_idx][r][c] == "":
-                        moves.append((b_idx, r, c))
+            occupied = state.masks[0][b_idx] | state.masks[1][b_idx]
+            for cell in EMPTY_CELLS[occupied]:
+                moves.append((b_idx, cell // 3, cell % 3))
         return moves
 
+    def reset_eval(self, state):
+        """Initialise the incremental evaluation from a full evaluation of state."""
+        self.eval_small = 0
+        for i in range(9):
+            if not state.closed & CELL_BITS[i]:
+                self.eval_small += self.board_score[TERNARY[state.masks[0][i]] + 2 * TERNARY[state.masks[1][i]]]
+        self.eval_big = self.evaluate(state) - self.eval_small
+        self.eval_stack = []
+
+    def make(self, state, board_idx, r, c):
+        """make_move plus an O(1) update of the evaluation: only one small board changes."""
+        x_masks, o_masks = state.masks
+        closed = state.closed
+        board_score = self.board_score
+        before = board_score[TERNARY[x_masks[board_idx]] + 2 * TERNARY[o_masks[board_idx]]]
+        state.make_move(board_idx, r, c)
+        self.eval_stack.append((self.eval_small, self.eval_big))
+
+        if state.closed == closed:
+            self.eval_small += board_score[TERNARY[x_masks[board_idx]] + 2 * TERNARY[o_masks[board_idx]]] - before
+        else:
+            # Board was decided: it leaves the small-board sum and the big board changes
+            self.eval_small -= before
+            big_x, big_o = state.big
+            drawn = state.big_draw
+            self.eval_big = (self.o_line_score[TERNARY[big_x | drawn] + 2 * TERNARY[big_o]]
+                             + self.x_line_score[TERNARY[big_x] + 2 * TERNARY[big_o | drawn]]) * self.big_weight
+
+    def unmake(self, state):
+        state.unmake_move()
+        self.eval_small, self.eval_big = self.eval_stack.pop()
+
     def evaluate(self, state):
-        score = 0
+        x_masks, o_masks = state.masks
+        big_x, big_o = state.big
+        drawn = state.big_draw
         
-        # Evaluate Big Board
-        score += self.evaluate_board(state.board_states) * 10
+        # Evaluate Big Board: a drawn board blocks lines for both players
+        score = (self.o_line_score[TERNARY[big_x | drawn] + 2 * TERNARY[big_o]]
+                 + self.x_line_score[TERNARY[big_x] + 2 * TERNARY[big_o | drawn]]) * self.big_weight
         
         # Evaluate Small Boards
+        closed = state.closed
         for i in range(9):
             # Only eval active boards, adds nuance
-            if state.board_states[i] == "":
-                 # Convert 3x3 array to list for common eval
-                 flat_board = []
-                 for r in range(3):
-                     for c in range(3):
-                         flat_board.append(state.small_boards[i][r][c])
-                 score += self.evaluate_board(flat_board)
+            if not closed & CELL_BITS[i]:
+                 score += self.board_score[TERNARY[x_masks[i]] + 2 * TERNARY[o_masks[i]]]
         
         return score
 
@@ -159,23 +429,78 @@ class MinimaxAI:
         return score
 
     def evaluate_line(self, line):
-        o_count = line.count("O")
-        x_count = line.count("X")
-        empty_count = line.count("")
-        
-        score = 0
-        if o_count == 3:
-            score += 100
-        elif o_count == 2 and empty_count == 1:
-            score += 10
-        elif o_count == 1 and empty_count == 2:
-            score += 1
-            
-        if x_count == 3:
-            score -= 100
-        elif x_count == 2 and empty_count == 1:
-            score -= 10
-        elif x_count == 1 and empty_count == 2:
-            score -= 1
-            
-        return score
+        return line_score(line, self.weights["two"], self.weights["one"])
+
+
+def line_score(line, two=10, one=1):
+    """Heuristic for one line of 3 cells, positive favours O."""
+    o_count = line.count("O")
+    x_count = line.count("X")
+    empty_count = line.count("")
+
+    score = 0
+    if o_count == 3:
+        score += 100
+    elif o_count == 2 and empty_count == 1:
+        score += two
+    elif o_count == 1 and empty_count == 2:
+        score += one
+
+    if x_count == 3:
+        score -= 100
+    elif x_count == 2 and empty_count == 1:
+        score -= two
+    elif x_count == 1 and empty_count == 2:
+        score -= one
+
+    return score
+
+
+def _build_line_tables(two=10, one=1):
+    """Score every board code from the O side and the X side separately (3**9 entries each)."""
+    cell_values = ("", "X", "O")
+    lines = [
+        (0,1,2), (3,4,5), (6,7,8), # rows
+        (0,3,6), (1,4,7), (2,5,8), # cols
+        (0,4,8), (2,4,6) # diags
+    ]
+    # Score of one line for each of its 27 ternary configurations. Hiding the
+    # other player's marks behind a neutral token isolates each side's part.
+    o_part = []
+    x_part = []
+    for code in range(27):
+        line = [cell_values[code // 3 ** k % 3] for k in range(3)]
+        o_part.append(line_score(["-" if v == "X" else v for v in line], two, one))
+        x_part.append(line_score(["-" if v == "O" else v for v in line], two, one))
+
+    o_table = []
+    x_table = []
+    for code in range(BOARD_CODES):
+        digits = [code // 3 ** i % 3 for i in range(9)]
+        o_score = 0
+        x_score = 0
+        for a, b, c in lines:
+            line_code = digits[a] + 3 * digits[b] + 9 * digits[c]
+            o_score += o_part[line_code]
+            x_score += x_part[line_code]
+        o_table.append(o_score)
+        x_table.append(x_score)
+    return tuple(o_table), tuple(x_table)
+
+
+# Heuristic tables indexed by engine.bitboard.board_code(x_mask, o_mask)
+O_LINE_SCORE, X_LINE_SCORE = _build_line_tables()
+BOARD_SCORE = tuple(o + x for o, x in zip(O_LINE_SCORE, X_LINE_SCORE))
+
+# Tables for non-default weights, built on first use
+_eval_tables = {(DEFAULT_WEIGHTS["two"], DEFAULT_WEIGHTS["one"]): (O_LINE_SCORE, X_LINE_SCORE, BOARD_SCORE)}
+
+
+def eval_tables(two, one):
+    """(O_LINE_SCORE, X_LINE_SCORE, BOARD_SCORE) for the given line weights."""
+    tables = _eval_tables.get((two, one))
+    if tables is None:
+        o_table, x_table = _build_line_tables(two, one)
+        tables = (o_table, x_table, tuple(o + x for o, x in zip(o_table, x_table)))
+        _eval_tables[(two, one)] = tables
+    return tables
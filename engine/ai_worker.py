@@ -0,0 +1,85 @@
+"""
+Background AI search
+Runs an AI search on a snapshot of the position in a worker thread so the
+frame loop keeps drawing. The state machine polls the task every frame and
+cancels it when the search is no longer wanted.
+"""
+
+import threading
+
+
+class AISearchTask:
+    """
+    One AI search running in a daemon thread.
+
+    The position is copied when the task is created, so the caller may keep
+    mutating its own game state. Cancelling sets an event that the search
+    checks periodically; the thread then exits on its own.
+    """
+
+    def __init__(self, ai, logic_state, deadline=None):
+        self.ai = ai
+        self.snapshot = logic_state.copy()
+        self.deadline = deadline
+        self.cancel_event = threading.Event()
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="ai-search", daemon=True)
+
+    @classmethod
+    def from_result(cls, ai, logic_state, move):
+        """A task that is already finished, e.g. answered from pondering."""
+        task = cls(ai, logic_state)
+        task.result = move
+        task._done.set()
+        return task
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _run(self):
+        try:
+            # One search per AI at a time: a cancelled task may still be unwinding
+            with self.ai.search_lock:
+                if not self.cancel_event.is_set():
+                    self.result = self.ai.get_best_move(self.snapshot, self.deadline, self.cancel_event)
+        except Exception as e:
+            self.error = e
+            print(f"AI search failed: {e}")
+        finally:
+            self._done.set()
+
+    def cancel(self):
+        """Ask the search to stop. Does not block."""
+        self.cancel_event.set()
+
+    @property
+    def failed(self):
+        """True once the search has finished by raising; the exception is in error."""
+        return self._done.is_set() and self.error is not None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def is_done(self):
+        return self._done.is_set()
+
+    def poll(self):
+        """
+        Non-blocking check for the result.
+
+        Returns:
+            tuple: (board_idx, row, col) once the search has finished,
+                   None while it is running, if it was cancelled or if it
+                   failed (see failed and error)
+        """
+        if not self._done.is_set() or self.cancel_event.is_set():
+            return None
+        return self.result
+
+    def wait(self, timeout=None):
+        """Block until the search finishes. Returns True if it did."""
+        return self._done.wait(timeout)
@@ -0,0 +1,140 @@
+"""
+Batched Monte Carlo rollouts with NumPy
+Plays many simulated games in lockstep: every step picks one heuristic-
+weighted random move for each unfinished game at once, using the same move
+weights as ProbabilityEngine. Boards are stored as arrays of 9-bit masks and
+all move rules are table lookups on them.
+
+NumPy is optional. HAS_NUMPY tells callers whether this module can be used;
+without it ProbabilityEngine keeps its one-game-at-a-time rollouts.
+"""
+
+from engine.bitboard import BIG_THREATS, FULL_MASK, IS_FULL, IS_WIN, TERNARY, WINNING_CELLS
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Result codes in the per-game winner array
+X_WIN, O_WIN, DRAW = 0, 1, 2
+
+
+def _build_tables():
+    """Lookup tables indexed by 9-bit masks (NumPy arrays)."""
+    cell_bits = (1 << np.arange(9)).astype(np.int16)
+
+    return {
+        "cell_bits": cell_bits,
+        "is_win": np.array(IS_WIN, dtype=bool),
+        "is_full": np.array(IS_FULL, dtype=bool),
+        "capture": np.array(WINNING_CELLS, dtype=np.int16),
+        "ternary": np.array(TERNARY, dtype=np.int32),
+        "threat": np.array(BIG_THREATS, dtype=np.int16),
+    }
+
+
+_tables = None
+
+
+def _get_tables():
+    global _tables
+    if _tables is None:
+        _tables = _build_tables()
+    return _tables
+
+
+def run_rollouts(state, simulations, capture_weight=3.0, threat_weight=2.5,
+                 center_weight=1.5, corner_weight=1.2, rng=None):
+    """
+    Play simulations heuristic-weighted random games from state.
+
+    Args:
+        state: UltimateTicTacToeLogic instance (not modified), game not over
+        simulations: Number of games to play
+        *_weight: Move weights, as in ProbabilityEngine
+        rng: numpy.random.Generator, or None for a fresh one
+
+    Returns:
+        tuple: (x_wins, o_wins, draws)
+    """
+    t = _get_tables()
+    cell_bits, is_win, is_full = t["cell_bits"], t["is_win"], t["is_full"]
+    capture_table, threat_table, ternary = t["capture"], t["threat"], t["ternary"]
+    if rng is None:
+        rng = np.random.default_rng()
+    n = simulations
+
+    masks = np.empty((n, 2, 9), dtype=np.int16)
+    masks[:] = state.masks
+    big = np.empty((n, 2), dtype=np.int16)
+    big[:] = state.big
+    closed = np.full(n, state.closed, dtype=np.int16)
+    next_board = np.full(n, state.next_board_index, dtype=np.int16)
+    turn = np.full(n, 0 if state.current_turn == "X" else 1, dtype=np.int16)
+    winner = np.full(n, DRAW, dtype=np.int8)
+
+    # Weight of each cell independent of position: center and corners
+    static = np.ones(9)
+    static[4] = center_weight
+    static[[0, 2, 6, 8]] = corner_weight
+    index = np.arange(9, dtype=np.int16)
+
+    active = np.arange(n)
+    while active.size:
+        k = active.size
+        rows = np.arange(k)
+        m = masks[active]
+        player = turn[active]
+        own = m[rows, player]
+        other = m[rows, 1 - player]
+        occupied = own | other
+        cl = closed[active]
+        nb = next_board[active]
+
+        # Legal cells (k, board, cell): open board we may play in, empty cell
+        open_boards = ((cl[:, None] >> index) & 1) == 0
+        allowed = np.where(nb[:, None] >= 0, index == nb[:, None], open_boards)
+        legal = allowed[:, :, None] & (((occupied[:, :, None] >> index) & 1) == 0)
+
+        weights = np.broadcast_to(static, (k, 9, 9)) * legal
+        # Cell completes a line of own on that board
+        captures = ((capture_table[own][:, :, None] >> index) & 1).astype(bool)
+        weights = np.where(captures, weights * capture_weight, weights)
+        # Owning the board would give two in a row with the third board still open
+        open_big = ~cl & FULL_MASK
+        targets = threat_table[ternary[big[active, player]] + 2 * ternary[open_big]]
+        threats = ((targets[:, None] >> index) & 1).astype(bool)
+        weights = np.where(threats[:, :, None], weights * threat_weight, weights)
+        # Sending the opponent to a closed board gives them a free choice
+        sends_free = ((cl[:, None] >> index) & 1).astype(bool)
+        weights = np.where(sends_free[:, None, :], weights * 1.3, weights)
+
+        # Weighted sampling: first cell whose cumulative weight exceeds a uniform draw
+        cumulative = np.cumsum(weights.reshape(k, 81), axis=1)
+        draw = rng.random(k) * cumulative[:, -1]
+        choice = (cumulative <= draw[:, None]).sum(axis=1)
+        board = choice // 9
+        cell = choice % 9
+
+        new_own = own[rows, board] | cell_bits[cell]
+        masks[active, player, board] = new_own
+        board_bit = cell_bits[board]
+        won = is_win[new_own]
+        full = ~won & is_full[new_own | other[rows, board]]
+        big_own = big[active, player] | np.where(won, board_bit, 0)
+        big[active, player] = big_own
+        cl = cl | np.where(won | full, board_bit, 0)
+        closed[active] = cl
+
+        game_won = won & is_win[big_own]
+        game_drawn = ~game_won & (cl == FULL_MASK)
+        winner[active[game_won]] = player[game_won]
+        next_board[active] = np.where((cl >> cell) & 1, -1, cell)
+        turn[active] = 1 - player
+        active = active[~(game_won | game_drawn)]
+
+    counts = np.bincount(winner, minlength=3)
+    return int(counts[X_WIN]), int(counts[O_WIN]), int(counts[DRAW])
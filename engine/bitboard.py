@@ -0,0 +1,104 @@
+"""
+Bitboard tables for Ultimate Tic-Tac-Toe
+A 3x3 board is stored as a 9-bit mask, bit (row * 3 + col) set for an
+occupied cell. The same encoding is used for the big board, where bit i
+stands for small board i. All tables are built once at import time.
+"""
+
+FULL_MASK = 0x1FF
+
+# Bit for every cell index 0-8
+CELL_BITS = tuple(1 << i for i in range(9))
+
+# The 8 winning lines as masks: rows, cols, diagonals
+WIN_LINES = (
+    0b000000111, 0b000111000, 0b111000000,  # rows
+    0b001001001, 0b010010010, 0b100100100,  # cols
+    0b100010001, 0b001010100                # diags
+)
+
+# IS_WIN[mask] -> True if mask contains a full line
+IS_WIN = tuple(any(mask & line == line for line in WIN_LINES) for mask in range(512))
+
+# IS_FULL[mask] -> True if all nine cells are occupied (draw if not a win)
+IS_FULL = tuple(mask == FULL_MASK for mask in range(512))
+
+# WINNING_CELLS[mask] -> mask of cells that would complete a line of mask.
+# Cells already taken by the other player still have to be masked out.
+WINNING_CELLS = tuple(
+    sum(1 << i for i in range(9) if not mask & (1 << i) and IS_WIN[mask | (1 << i)])
+    for mask in range(512)
+)
+
+# EMPTY_CELLS[occupied] -> tuple of free cell indices, in row-major order
+EMPTY_CELLS = tuple(
+    tuple(i for i in range(9) if not mask & (1 << i))
+    for mask in range(512)
+)
+
+# Cell index -> (row, col)
+CELL_COORDS = tuple((i // 3, i % 3) for i in range(9))
+
+# TERNARY[mask] -> sum of 3**i over set bits. A 3x3 board with X cells x
+# and O cells o is encoded as TERNARY[x] + 2 * TERNARY[o] (0 = "", 1 = X, 2 = O),
+# giving an index into the 3**9 = 19683 entry board tables.
+TERNARY = tuple(sum(3 ** i for i in range(9) if mask & (1 << i)) for mask in range(512))
+BOARD_CODES = 3 ** 9
+
+
+def board_code(x_mask, o_mask):
+    """Index of a 3x3 board in the 3**9 tables."""
+    return TERNARY[x_mask] + 2 * TERNARY[o_mask]
+
+
+def _board_status(x_mask, o_mask):
+    if IS_WIN[x_mask]: return "X"
+    if IS_WIN[o_mask]: return "O"
+    if IS_FULL[x_mask | o_mask]: return "D"
+    return ""
+
+
+def _build_status_table():
+    table = [""] * BOARD_CODES
+    for x_mask in range(512):
+        for o_mask in range(512):
+            if not x_mask & o_mask:
+                table[TERNARY[x_mask] + 2 * TERNARY[o_mask]] = _board_status(x_mask, o_mask)
+    return tuple(table)
+
+
+# BOARD_STATUS[code] -> "" (playing), "X", "O" or "D" (Draw)
+BOARD_STATUS = _build_status_table()
+
+
+def _build_big_threat_table():
+    popcount = [bin(mask).count("1") for mask in range(512)]
+    table = [0] * BOARD_CODES
+    for own in range(512):
+        # Every subset of the boards own does not hold
+        free_boards = FULL_MASK & ~own
+        open_ = free_boards
+        while True:
+            targets = 0
+            for line in WIN_LINES:
+                owned = popcount[own & line]
+                free = open_ & line
+                free_count = popcount[free]
+                if owned == 2 and free_count == 1:
+                    # Already a threat, whichever other board is taken
+                    targets |= open_ & ~line
+                elif owned == 1 and free_count == 2:
+                    # Taking either open board of the line makes it two in a row
+                    targets |= free
+            table[TERNARY[own] + 2 * TERNARY[open_]] = targets
+            if not open_:
+                break
+            open_ = (open_ - 1) & free_boards
+    return tuple(table)
+
+
+# BIG_THREATS[TERNARY[own] + 2 * TERNARY[open]] -> mask of open boards that,
+# once won by the player owning the boards in own, give that player two boards
+# in a line with the third still open. open is the set of boards not yet
+# closed (won or drawn) and must not overlap own.
+BIG_THREATS = _build_big_threat_table()
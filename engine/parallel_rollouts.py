@@ -0,0 +1,126 @@
+"""
+Multi-process Monte Carlo rollouts
+Shards the simulations of every evaluation across a persistent process pool
+and merges the counts. Each shard runs with its own random stream, seeded
+from the engine's master stream, so a ParallelProbabilityEngine created with
+a given seed and worker count returns the same results every run.
+
+Run as a script to benchmark throughput against the number of workers:
+    python -m engine.parallel_rollouts
+"""
+
+import os
+import random
+import time
+
+from engine.probability_engine import ProbabilityEngine
+from engine.process_pool import PersistentPool, benchmark_worker_counts
+from engine.ultimate_logic import UltimateTicTacToeLogic, random_position
+
+# Fewest simulations worth sending to a worker: smaller shards lose more to
+# inter-process traffic and to NumPy batching than they gain in parallelism
+SHARD_SIMULATIONS = 250
+
+# Per-process engine, set by _init_worker
+_worker_engine = None
+
+
+def _init_worker(use_numpy):
+    global _worker_engine
+    _worker_engine = ProbabilityEngine(use_numpy=use_numpy, cache_mb=0)
+
+
+def _run_shard(position, simulations, seed, weights):
+    """
+    Play one shard of simulations in a worker process, with the parent's
+    current move weights.
+
+    Returns:
+        tuple: (wins, losses, draws) for the player to move
+    """
+    engine = _worker_engine
+    if weights != _weights(engine):
+        (engine.CAPTURED_BOARD_WEIGHT, engine.THREAT_WEIGHT,
+         engine.CENTER_WEIGHT, engine.CORNER_WEIGHT) = weights
+    state = UltimateTicTacToeLogic.from_position(position)
+    _worker_engine.seed(seed)
+    return _worker_engine._count_results(state, simulations)
+
+
+def _weights(engine):
+    return (engine.CAPTURED_BOARD_WEIGHT, engine.THREAT_WEIGHT, engine.CENTER_WEIGHT, engine.CORNER_WEIGHT)
+
+
+class ParallelProbabilityEngine(PersistentPool, ProbabilityEngine):
+    """
+    ProbabilityEngine that plays its simulations in worker processes.
+    The pool starts on first use and is reused for every following evaluation.
+    Evaluations too small to give every worker SHARD_SIMULATIONS use fewer
+    workers, or none.
+    """
+
+    def __init__(self, use_numpy=True, seed=None, cache_mb=4, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        super().__init__(use_numpy=use_numpy, seed=seed, cache_mb=cache_mb)
+
+    def seed(self, seed=None):
+        super().seed(seed)
+        # Shard seeds are drawn from this stream, one per shard per evaluation
+        self.seed_rng = random.Random(seed)
+
+    def pool_initializer(self):
+        return _init_worker, (self.use_numpy,)
+
+    def iter_win_probabilities(self, game_state, tolerance=0.05, time_slice_ms=None,
+                               batch_size=50, max_simulations=2000):
+        """ProbabilityEngine.iter_win_probabilities, with batches big enough to shard across every worker."""
+        if self.workers > 1:
+            batch_size = max(batch_size, self.workers * SHARD_SIMULATIONS)
+        return super().iter_win_probabilities(game_state, tolerance, time_slice_ms, batch_size, max_simulations)
+
+    def _count_results(self, game_state, simulations):
+        count = min(self.workers, simulations // SHARD_SIMULATIONS)
+        if count <= 1:
+            return super()._count_results(game_state, simulations)
+
+        self.start_pool()
+        position = game_state.to_position()
+        shards = [simulations // count + (i < simulations % count) for i in range(count)]
+        weights = _weights(self)
+        futures = [self.pool.submit(_run_shard, position, n, self.seed_rng.getrandbits(64), weights)
+                   for n in shards]
+        wins = losses = draws = 0
+        for future in futures:
+            w, l, d = future.result()
+            wins += w
+            losses += l
+            draws += d
+        return (wins, losses, draws)
+
+
+def benchmark(simulations=4000, positions=4, seed=1, use_numpy=False):
+    """Time evaluations on random positions for 1..cpu_count workers."""
+    rng = random.Random(seed)
+    states = [random_position(rng) for _ in range(positions)]
+
+    counts = benchmark_worker_counts()
+    print(f"{simulations} simulations x {positions} positions, {os.cpu_count() or 1} CPU(s), numpy={use_numpy}")
+    print("Workers | Time (s) | Simulations/s | Speedup")
+    print("-" * 46)
+    base = None
+    for workers in counts:
+        engine = ParallelProbabilityEngine(use_numpy=use_numpy, seed=seed, workers=workers)
+        if workers > 1:
+            engine.start_pool()
+        start = time.perf_counter()
+        for state in states:
+            engine.evaluate_win_probabilities(state, simulations)
+        elapsed = time.perf_counter() - start
+        engine.close()
+        base = base or elapsed
+        rate = simulations * positions / elapsed
+        print(f"{workers:7d} | {elapsed:8.2f} | {rate:13.0f} | {base / elapsed:6.2f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
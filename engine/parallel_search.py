@@ -0,0 +1,247 @@
+"""
+Root-parallel minimax search
+Splits the root moves of every iterative-deepening step across a persistent
+process pool. Workers share the best root score found so far (the alpha
+bound) through shared memory, so a strong move found by one worker prunes
+the moves still being searched by the others.
+
+Run as a script to benchmark speedup against the number of workers:
+    python -m engine.parallel_search
+"""
+
+import os
+import random
+import time
+from concurrent.futures import wait, FIRST_EXCEPTION
+
+from engine.ai_minimax import MinimaxAI, SearchTimeout, WIN_SCORE
+from engine.process_pool import PersistentPool, benchmark_worker_counts, spawn_context
+from engine.search_stats import SearchStats
+from engine.ultimate_logic import UltimateTicTacToeLogic, as_logic, random_position
+
+# How long the parent waits between checks of the cancel event
+POLL_INTERVAL = 0.02
+
+# Per-process state, set by _init_worker
+_worker_ai = None
+_shared_alpha = None
+_stop_event = None
+# Search id of the last share searched by this worker
+_worker_search_id = None
+
+
+def _init_worker(depth, tt_size_mb, weights, shared_alpha, stop_event):
+    global _worker_ai, _shared_alpha, _stop_event
+    _worker_ai = MinimaxAI(depth=depth, tt_size_mb=tt_size_mb, weights=weights)
+    _shared_alpha = shared_alpha
+    _stop_event = stop_event
+
+
+def _search_moves(position, moves, depth, time_left, search_id):
+    """
+    Search a share of the root moves to a fixed depth in a worker process.
+    Shares of the same search_id (one get_best_move call) keep the TT age
+    and move-ordering state of the earlier ones.
+
+    Returns:
+        tuple: (results, counters) where results is a list of
+               (move, score, exact) or None if the search was stopped, and
+               counters is (nodes, tt_hits, tt_misses, beta_cutoffs, first_move_cutoffs)
+    """
+    global _worker_search_id
+    ai = _worker_ai
+    state = UltimateTicTacToeLogic.from_position(position)
+    deadline = time.perf_counter() + time_left if time_left is not None else None
+    ai.begin_search(state, deadline, _stop_event, new_root=search_id != _worker_search_id)
+    _worker_search_id = search_id
+    ai.root_depth = depth
+
+    # Scores are from O's side; the shared bound is from the mover's (score * sign)
+    maximizing = state.current_turn == "O"
+    sign = 1 if maximizing else -1
+    results = []
+    try:
+        for move in moves:
+            # Bound shared with the other workers, only moves that beat it matter
+            bound = _shared_alpha.value
+            ai.make(state, *move)
+            if maximizing:
+                score = ai.minimax(state, depth - 1, bound, float('inf'), False)
+            else:
+                score = ai.minimax(state, depth - 1, -float('inf'), -bound, True)
+            ai.unmake(state)
+            exact = score * sign > bound
+            if exact:
+                with _shared_alpha.get_lock():
+                    if score * sign > _shared_alpha.value:
+                        _shared_alpha.value = score * sign
+            results.append((move, score, exact))
+    except SearchTimeout:
+        results = None
+    counters = (ai.node_count, ai.tt.hits - ai.tt_hits_start, ai.tt.misses - ai.tt_misses_start,
+                ai.beta_cutoffs, ai.first_move_cutoffs)
+    return results, counters
+
+
+class ParallelMinimaxAI(PersistentPool, MinimaxAI):
+    """
+    MinimaxAI that searches the root moves in parallel worker processes.
+    The pool starts on first use and is reused for every following move.
+    """
+
+    def __init__(self, depth=4, tt_size_mb=16, workers=None, weights=None):
+        super().__init__(depth=depth, tt_size_mb=tt_size_mb, weights=weights)
+        self.workers = workers or os.cpu_count() or 1
+        self.tt_size_mb = tt_size_mb
+        self.shared_alpha = None
+        self.stop_event = None
+        # Worker tt_hits, tt_misses, beta_cutoffs, first_move_cutoffs of the current search
+        self.counters = [0, 0, 0, 0]
+        # Tells the workers which shares belong to the same search
+        self.search_id = 0
+
+    def pool_initializer(self):
+        ctx = spawn_context()
+        self.shared_alpha = ctx.Value("d", -float('inf'))
+        self.stop_event = ctx.Event()
+        return _init_worker, (self.max_depth, self.tt_size_mb, self.weights, self.shared_alpha, self.stop_event)
+
+    def close(self):
+        if self.pool is not None:
+            # Workers still searching stop at their next check
+            self.stop_event.set()
+        super().close()
+
+    def search(self, logic_state, deadline=None, cancel=None):
+        if self.workers <= 1:
+            return super().search(logic_state, deadline, cancel)
+
+        logic_state = as_logic(logic_state)
+        self.start_pool()
+        self.stop_event.clear()
+        self.search_id += 1
+        self.node_count = 0
+        self.depth_reached = 0
+        self.counters = [0, 0, 0, 0]
+        start_time = time.perf_counter()
+        position = logic_state.to_position()
+
+        moves = self.get_legal_moves(logic_state)
+        if not moves:
+            return self.finish_search(SearchStats("minimax", workers=self.workers))
+        random.shuffle(moves)
+
+        best_move = moves[0]
+        best_score = 0
+        iteration_nodes = []
+        for depth in range(1, self.max_depth + 1):
+            nodes_before = self.node_count
+            result = self.search_parallel(position, moves, depth, deadline, cancel)
+            if result is None:
+                # Stopped mid-iteration, keep the previous result
+                break
+            best_move, best_score = result
+            self.depth_reached = depth
+            iteration_nodes.append(self.node_count - nodes_before)
+
+            # Previous best first next time, so it lands at the front of a worker's share
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+
+            if abs(best_score) >= WIN_SCORE:
+                break
+            if deadline is not None:
+                now = time.perf_counter()
+                if now + (now - start_time) * 2 >= deadline:
+                    break
+
+        tt_hits, tt_misses, cutoffs, first_cutoffs = self.counters
+        probes = tt_hits + tt_misses
+        # The parent does not search, so its TT holds no line beyond the root move
+        stats = SearchStats(
+            "minimax", best_move, best_score, self.depth_reached, self.node_count,
+            (time.perf_counter() - start_time) * 1000, tt_hits / probes if probes else 0.0,
+            cutoffs, first_cutoffs, iteration_nodes, [best_move], self.workers)
+        return self.finish_search(stats)
+
+    def search_parallel(self, position, moves, depth, deadline=None, cancel=None):
+        """
+        Search all root moves to a fixed depth across the pool.
+
+        Returns:
+            tuple: (best_move, best_score), or None if the deadline passed
+                   or the search was cancelled before every share finished
+        """
+        self.shared_alpha.value = -float('inf')
+        # Round-robin so every worker gets a mix of well and badly ordered moves
+        shares = [moves[i::self.workers] for i in range(self.workers)]
+        shares = [share for share in shares if share]
+
+        def time_left():
+            return None if deadline is None else deadline - time.perf_counter()
+
+        futures = [self.pool.submit(_search_moves, position, share, depth, time_left(), self.search_id)
+                   for share in shares]
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=POLL_INTERVAL, return_when=FIRST_EXCEPTION)
+            stopped = (cancel is not None and cancel.is_set()) or (deadline is not None and time.perf_counter() >= deadline)
+            if stopped and pending:
+                self.stop_event.set()
+                wait(pending)
+                self.stop_event.clear()
+                return None
+
+        # Compare from the mover's side, O maximises and X minimises
+        sign = 1 if position.side == 1 else -1
+        best_move = None
+        best_score = -float('inf')
+        fallback = None
+        for future in futures:
+            results, counters = future.result()
+            self.node_count += counters[0]
+            for i, value in enumerate(counters[1:]):
+                self.counters[i] += value
+            if results is None:
+                return None
+            for move, score, exact in results:
+                # Fail-low scores are only bounds, never prefer them to an exact one
+                if exact and score * sign > best_score:
+                    best_move, best_score = move, score * sign
+                elif fallback is None or score * sign > fallback[1]:
+                    fallback = (move, score * sign)
+        if best_move is None:
+            best_move, best_score = fallback
+        return best_move, best_score * sign
+
+
+def benchmark(depth=7, positions=6, seed=1):
+    """Time fixed-depth searches on random middlegame positions for 1..cpu_count workers."""
+    rng = random.Random(seed)
+    states = [random_position(rng, 4, 15, side="O") for _ in range(positions)]
+
+    counts = benchmark_worker_counts()
+    print(f"Depth {depth}, {positions} positions, {os.cpu_count() or 1} CPU(s)")
+    print("Workers | Time (s) | Nodes     | Speedup")
+    print("-" * 42)
+    base = None
+    for workers in counts:
+        ai = ParallelMinimaxAI(depth=depth, workers=workers)
+        if workers > 1:
+            ai.start_pool()
+            # Warm the pool so process start-up is not timed
+            ai.get_best_move(states[0])
+        nodes = 0
+        start = time.perf_counter()
+        for state in states:
+            random.seed(0)
+            ai.get_best_move(state)
+            nodes += ai.node_count
+        elapsed = time.perf_counter() - start
+        ai.close()
+        base = base or elapsed
+        print(f"{workers:7d} | {elapsed:8.2f} | {nodes:9d} | {base / elapsed:6.2f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
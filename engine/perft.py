@@ -0,0 +1,183 @@
+"""
+Perft: move generation counting and cross-checking
+Counts the leaf nodes of the game tree to a fixed depth, the standard way to
+benchmark a move generator and to check it against known numbers. A game
+that ends before the depth is reached contributes no leaves.
+
+The engine has more than one move generator (the game logic, MinimaxAI and
+ProbabilityEngine each have their own). Every one of them can be counted and
+compared, move for move, against a plain reference implementation of the
+rules.
+
+Run as a script:
+    python -m engine.perft 4               nodes and nodes/sec per generator
+    python -m engine.perft 3 --divide      leaf count under each first move
+    python -m engine.perft 3 --check       compare every generator with the reference
+"""
+
+import argparse
+import time
+
+from engine.ai_minimax import MinimaxAI
+from engine.probability_engine import ProbabilityEngine
+from engine.ultimate_logic import UltimateTicTacToeLogic
+
+# Moves that lead to the named test positions
+POSITIONS = {
+    "start": (),
+    # 37 plies in: boards 2 and 4 won by O, board 7 by X, O to move anywhere
+    "late": ((4, 1, 1), (4, 0, 2), (2, 2, 2), (8, 2, 2), (8, 1, 1), (4, 2, 2), (8, 1, 2), (5, 1, 0),
+             (3, 2, 0), (6, 0, 2), (2, 0, 2), (2, 2, 1), (7, 0, 1), (1, 2, 1), (7, 1, 1), (4, 0, 1),
+             (1, 0, 2), (2, 1, 1), (4, 1, 0), (3, 0, 0), (0, 0, 1), (1, 1, 1), (4, 0, 0), (0, 1, 0),
+             (3, 1, 1), (4, 2, 1), (7, 0, 2), (2, 0, 1), (1, 0, 0), (0, 2, 1), (7, 2, 1), (4, 2, 0),
+             (6, 2, 0), (6, 2, 1), (5, 1, 2), (5, 0, 0), (0, 0, 2)),
+}
+
+# Leaf counts by position and depth (index = depth), computed with the
+# original list-based rules before the move to bitboards
+REFERENCE_COUNTS = {
+    "start": (1, 81, 720, 6336, 55080, 473256),
+    "late": (1, 34, 461, 6238, 78547, 989547),
+}
+
+
+def reference_moves(state):
+    """Legal moves read straight off the string views: slow, but obviously right."""
+    if state.game_over:
+        return []
+    if state.next_board_index != -1 and state.board_states[state.next_board_index] == "":
+        boards = [state.next_board_index]
+    else:
+        boards = [b for b in range(9) if state.board_states[b] == ""]
+    return [(b, r, c) for b in boards for r in range(3) for c in range(3)
+            if state.small_boards[b][r][c] == ""]
+
+
+def _generators():
+    minimax = MinimaxAI(depth=1, tt_size_mb=0)
+    probability = ProbabilityEngine(use_numpy=False, cache_mb=0)
+    return {
+        "reference": reference_moves,
+        "logic": UltimateTicTacToeLogic.get_legal_moves,
+        "minimax": minimax.get_legal_moves,
+        "probability": probability._get_valid_moves,
+    }
+
+
+GENERATORS = _generators()
+
+
+def position(name):
+    """Fresh game logic for one of the named POSITIONS."""
+    state = UltimateTicTacToeLogic()
+    for move in POSITIONS[name]:
+        if not state.make_move(*move):
+            raise ValueError(f"Illegal move {move} in position {name}")
+    return state
+
+
+def perft(state, depth, generator=UltimateTicTacToeLogic.get_legal_moves):
+    """Number of leaf nodes depth moves below state. state is restored afterwards."""
+    if depth == 0:
+        return 1
+    if state.game_over:
+        return 0
+    moves = generator(state)
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        state.make_move(*move)
+        nodes += perft(state, depth - 1, generator)
+        state.unmake_move()
+    return nodes
+
+
+def divide(state, depth, generator=UltimateTicTacToeLogic.get_legal_moves):
+    """Leaf count below each legal move, as a list of (move, nodes)."""
+    results = []
+    if depth == 0 or state.game_over:
+        return results
+    for move in generator(state):
+        state.make_move(*move)
+        results.append((move, perft(state, depth - 1, generator)))
+        state.unmake_move()
+    return results
+
+
+def cross_check(state, depth, generators=None, limit=10):
+    """
+    Walk the tree to depth with the reference rules and compare the moves of
+    every generator at every node.
+
+    Returns:
+        list: up to limit (generator name, move history, missing, extra)
+              tuples; empty if all generators agree everywhere
+    """
+    generators = generators or {name: gen for name, gen in GENERATORS.items() if name != "reference"}
+    mismatches = []
+
+    def walk(depth):
+        if len(mismatches) >= limit or state.game_over:
+            return
+        expected = set(reference_moves(state))
+        for name, generator in generators.items():
+            moves = generator(state)
+            got = set(moves)
+            if got != expected or len(moves) != len(got):
+                path = [entry[:2] for entry in state.history]
+                mismatches.append((name, path, sorted(expected - got), sorted(got - expected)))
+        if depth == 0:
+            return
+        for move in expected:
+            state.make_move(*move)
+            walk(depth - 1)
+            state.unmake_move()
+
+    walk(depth)
+    return mismatches[:limit]
+
+
+def benchmark(depth=4, name="start"):
+    """Leaf count, time and nodes/sec of every generator on one position."""
+    print(f"Perft {depth} from '{name}'")
+    print("Generator   | Nodes     | Time (s) | Nodes/s")
+    print("-" * 46)
+    expected = REFERENCE_COUNTS.get(name, ())
+    for gen_name, generator in GENERATORS.items():
+        state = position(name)
+        start = time.perf_counter()
+        nodes = perft(state, depth, generator)
+        elapsed = time.perf_counter() - start
+        flag = ""
+        if depth < len(expected) and nodes != expected[depth]:
+            flag = f"  MISMATCH (expected {expected[depth]})"
+        print(f"{gen_name:11s} | {nodes:9d} | {elapsed:8.2f} | {nodes / elapsed:9.0f}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perft for Ultimate Tic-Tac-Toe move generation")
+    parser.add_argument("depth", type=int, nargs="?", default=4)
+    parser.add_argument("--position", choices=sorted(POSITIONS), default="start")
+    parser.add_argument("--generator", choices=sorted(GENERATORS), default="logic")
+    parser.add_argument("--divide", action="store_true", help="count below each first move")
+    parser.add_argument("--check", action="store_true", help="compare generators with the reference rules")
+    args = parser.parse_args()
+
+    if args.divide:
+        state = position(args.position)
+        results = divide(state, args.depth, GENERATORS[args.generator])
+        for move, nodes in results:
+            print(f"{move}: {nodes}")
+        print(f"Moves: {len(results)}  Nodes: {sum(nodes for _, nodes in results)}")
+    elif args.check:
+        mismatches = cross_check(position(args.position), args.depth)
+        for name, path, missing, extra in mismatches:
+            print(f"{name} after {path}: missing {missing} extra {extra}")
+        print("All generators agree" if not mismatches else f"{len(mismatches)} mismatch(es)")
+    else:
+        benchmark(args.depth, args.position)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Pondering: AI search on the opponent's time
+While the human thinks, the AI searches its reply to the human's most
+likely moves in a background thread. If the human then plays one of them
+the stored answer is used immediately; otherwise the work still warms the
+AI's transposition table for the real search.
+"""
+
+import threading
+import time
+
+
+class Ponderer:
+    """
+    Background search of the AI's answers to predicted opponent moves.
+
+    Results are keyed by the Zobrist key of the position after the
+    opponent's move, so take() only returns an answer for the exact
+    position that was pondered.
+    """
+
+    def __init__(self, ai, max_replies=4, slice_ms=1500):
+        self.ai = ai
+        self.max_replies = max_replies
+        self.slice_ms = slice_ms
+        self.results = {}
+        self.hits = 0
+        self.misses = 0
+        self.cancel_event = threading.Event()
+        self._thread = None
+
+    def start(self, logic_state):
+        """Start pondering a position where the opponent is to move."""
+        self.stop()
+        self.results = {}
+        self.cancel_event = threading.Event()
+        snapshot = logic_state.copy()
+        self._thread = threading.Thread(target=self._run, args=(snapshot, self.cancel_event),
+                                        name="ai-ponder", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Abandon pondering and wait for the thread to leave the search."""
+        self.cancel_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def take(self, logic_state):
+        """
+        Stop pondering and return the stored answer for this position.
+
+        On a hit the stored search's stats are published as if the search
+        had just run, so ai.last_stats describes the move played.
+
+        Returns:
+            tuple: (board_idx, row, col) on a ponder hit, None otherwise
+        """
+        self.stop()
+        result = self.results.pop(logic_state.zobrist_key, None)
+        self.results = {}
+        if result is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        move, stats = result
+        self.ai.finish_search(stats)
+        return move
+
+    def predict_replies(self, state):
+        """Opponent moves worth pondering, most likely first."""
+        moves = state.get_legal_moves()
+        # The AI's own principal variation from its last search comes first
+        entry = self.ai.tt.probe(state.zobrist_key)
+        predicted = entry[3] if entry and entry[3] in moves else None
+
+        # Then the moves that look best for the opponent (lowest score for the AI)
+        scored = []
+        for move in moves:
+            if move == predicted:
+                continue
+            state.make_move(*move)
+            scored.append((self.ai.evaluate(state), move))
+            state.unmake_move()
+        scored.sort(key=lambda item: item[0])
+
+        replies = [move for _, move in scored]
+        if predicted is not None:
+            replies.insert(0, predicted)
+        return replies[:self.max_replies]
+
+    def _run(self, state, cancel_event):
+        with self.ai.search_lock:
+            # Ponder searches only count if one of them gets played, see take()
+            self.ai.publish_stats = False
+            try:
+                for move in self.predict_replies(state):
+                    if cancel_event.is_set():
+                        return
+                    state.make_move(*move)
+                    if not state.game_over:
+                        deadline = time.perf_counter() + self.slice_ms / 1000
+                        stats = self.ai.search(state, deadline, cancel_event)
+                        # A cancelled search only had part of its slice, don't trust it
+                        if not cancel_event.is_set() and stats.move is not None:
+                            stats.details["ponder"] = True
+                            self.results[state.zobrist_key] = (stats.move, stats)
+                    state.unmake_move()
+            finally:
+                self.ai.publish_stats = True
@@ -0,0 +1,91 @@
+"""
+Immutable position snapshot
+A Position holds everything needed to continue a game from a point, packed
+into three ints, plus the Zobrist key so hashing is O(1). It is cheap to
+create, compare, pickle to worker processes and use as a dict key, unlike
+the mutable UltimateTicTacToeLogic with its move history.
+
+Use UltimateTicTacToeLogic.to_position() / from_position() to convert.
+"""
+
+# Layout of Position.meta: X boards | O boards | drawn boards | side | next board + 1
+_O_BIG_SHIFT = 9
+_DRAW_SHIFT = 18
+_SIDE_SHIFT = 27
+_NEXT_SHIFT = 28
+
+
+class Position:
+    """
+    x and o hold the per-board cell masks of each player, 9 bits per board
+    (board b at bits 9*b .. 9*b+8). meta packs the big board, side to move
+    and forced board. key is the Zobrist key of the position.
+    """
+    __slots__ = ("x", "o", "meta", "key")
+
+    def __init__(self, x, o, meta, key):
+        object.__setattr__(self, "x", x)
+        object.__setattr__(self, "o", o)
+        object.__setattr__(self, "meta", meta)
+        object.__setattr__(self, "key", key)
+
+    @classmethod
+    def pack(cls, x_masks, o_masks, big_x, big_o, big_draw, side, next_board, key):
+        """Build from per-board mask lists; side is 0 for X to move, 1 for O."""
+        x = 0
+        o = 0
+        for b in range(8, -1, -1):
+            x = (x << 9) | x_masks[b]
+            o = (o << 9) | o_masks[b]
+        meta = (big_x | big_o << _O_BIG_SHIFT | big_draw << _DRAW_SHIFT
+                | side << _SIDE_SHIFT | (next_board + 1) << _NEXT_SHIFT)
+        return cls(x, o, meta, key)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Position is immutable")
+
+    def __hash__(self):
+        return self.key
+
+    def __eq__(self, other):
+        if not isinstance(other, Position):
+            return NotImplemented
+        return self.x == other.x and self.o == other.o and self.meta == other.meta
+
+    def __reduce__(self):
+        return (Position, (self.x, self.o, self.meta, self.key))
+
+    def __repr__(self):
+        return f"Position(x={self.x:#x}, o={self.o:#x}, meta={self.meta:#x})"
+
+    # --- Unpacked fields ---
+
+    def x_masks(self):
+        return [(self.x >> (9 * b)) & 0x1FF for b in range(9)]
+
+    def o_masks(self):
+        return [(self.o >> (9 * b)) & 0x1FF for b in range(9)]
+
+    @property
+    def big_x(self):
+        return self.meta & 0x1FF
+
+    @property
+    def big_o(self):
+        return (self.meta >> _O_BIG_SHIFT) & 0x1FF
+
+    @property
+    def big_draw(self):
+        return (self.meta >> _DRAW_SHIFT) & 0x1FF
+
+    @property
+    def side(self):
+        """0 when X is to move, 1 when O is."""
+        return (self.meta >> _SIDE_SHIFT) & 1
+
+    @property
+    def next_board_index(self):
+        return (self.meta >> _NEXT_SHIFT) - 1
@@ -0,0 +1,78 @@
+"""
+Position cache for win-probability rollouts
+Bounded LRU map from a Position to the rollout counts seen so far for it.
+Counts rather than ratios are kept, so a later evaluation of the same
+position adds its simulations to the sample instead of starting over.
+"""
+
+from collections import OrderedDict
+
+# Rough cost of one entry: dict slot and link, Position key, list of three ints
+BYTES_PER_ENTRY = 400
+
+
+class ProbabilityCache:
+    """
+    Least-recently-used cache of (wins, losses, draws) counts, for the
+    player to move, keyed by Position. Positions hash by their Zobrist key
+    but compare in full, so a key collision never mixes up two positions.
+    """
+
+    def __init__(self, size_mb=4):
+        self.size_mb = size_mb
+        self.max_entries = max(1, int(size_mb * 1024 * 1024) // BYTES_PER_ENTRY)
+        self.entries = OrderedDict()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reused_simulations = 0
+
+    def clear(self):
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Returns:
+            tuple: (wins, losses, draws) counts for the position, or None
+        """
+        counts = self.entries.get(key)
+        if counts is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        self.reused_simulations += counts[0] + counts[1] + counts[2]
+        return tuple(counts)
+
+    def add(self, key, wins, losses, draws):
+        """Add newly simulated results to the position's counts."""
+        counts = self.entries.get(key)
+        if counts is None:
+            self.entries[key] = [wins, losses, draws]
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+        else:
+            counts[0] += wins
+            counts[1] += losses
+            counts[2] += draws
+            self.entries.move_to_end(key)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size_mb": self.size_mb,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "reused_simulations": self.reused_simulations,
+        }
@@ -1,10 +1,73 @@
 """
 Monte Carlo Win Probability Evaluator for Ultimate Tic-Tac-Toe
 Uses random simulations with heuristic weighting to estimate win probabilities.
+
+Run as a script to benchmark rollout throughput:
+    python -m engine.probability_engine
 """
 
+import math
 import random
 import copy
+import time
+from bisect import bisect_right
+from engine import batch_rollout
+from engine.probability_cache import ProbabilityCache
+from engine.ultimate_logic import as_logic
+from engine.bitboard import BIG_THREATS, CELL_BITS, EMPTY_CELLS, FULL_MASK, TERNARY, WINNING_CELLS
+
+# Cached per-board weight tables before the cache is emptied
+MAX_CACHED_WEIGHTS = 200000
+
+
+def _move_weight(name):
+    """
+    A heuristic weight attribute. Setting it empties the caches built with
+    the old value: the cumulative cell weights and the rollout counts.
+    """
+    attr = "_" + name.lower()
+
+    def get(self):
+        return getattr(self, attr)
+
+    def set(self, value):
+        setattr(self, attr, value)
+        self._weight_cache.clear()
+        if self.cache is not None:
+            self.cache.clear()
+
+    return property(get, set)
+
+
+class ProbabilityEstimate:
+    """
+    Win/lose/draw probabilities from a number of simulations, with the
+    standard error of each (binomial proportion).
+    """
+    
+    def __init__(self, wins, losses, draws):
+        self.simulations = wins + losses + draws
+        n = self.simulations
+        self.win = wins / n
+        self.lose = losses / n
+        self.draw = draws / n
+        self.win_error = math.sqrt(self.win * (1 - self.win) / n)
+        self.lose_error = math.sqrt(self.lose * (1 - self.lose) / n)
+        self.draw_error = math.sqrt(self.draw * (1 - self.draw) / n)
+    
+    @property
+    def probabilities(self):
+        """(win_prob, lose_prob, draw_prob), as returned by evaluate_win_probabilities"""
+        return (self.win, self.lose, self.draw)
+    
+    def half_width(self, z=1.96):
+        """Widest confidence interval half-width (95% by default)"""
+        return z * max(self.win_error, self.lose_error, self.draw_error)
+    
+    def __repr__(self):
+        return (f"ProbabilityEstimate(win={self.win:.3f}±{self.win_error:.3f}, "
+                f"lose={self.lose:.3f}±{self.lose_error:.3f}, "
+                f"draw={self.draw:.3f}±{self.draw_error:.3f}, n={self.simulations})")
 
 
 class ProbabilityEngine:
@@ -12,13 +75,30 @@ class ProbabilityEngine:
     Monte Carlo simulation engine for evaluating win probabilities
     in Ultimate Tic-Tac-Toe.
     """
+
+    # Weights for heuristic move selection; safe to change between evaluations
+    CAPTURED_BOARD_WEIGHT = _move_weight("CAPTURED_BOARD_WEIGHT")
+    THREAT_WEIGHT = _move_weight("THREAT_WEIGHT")
+    CENTER_WEIGHT = _move_weight("CENTER_WEIGHT")
+    CORNER_WEIGHT = _move_weight("CORNER_WEIGHT")
     
-    def __init__(self):
-        # Weights for heuristic move selection
+    def __init__(self, use_numpy=True, seed=None, cache_mb=4):
+        # (board cells, closed target boards) -> (empty cells, cumulative weights)
+        self._weight_cache = {}
+        # Rollout counts of positions seen before, extended rather than redone
+        self.cache = ProbabilityCache(cache_mb) if cache_mb else None
         self.CAPTURED_BOARD_WEIGHT = 3.0
         self.THREAT_WEIGHT = 2.5
         self.CENTER_WEIGHT = 1.5
         self.CORNER_WEIGHT = 1.2
+        # Play all simulations in lockstep with NumPy when it is installed
+        self.use_numpy = use_numpy and batch_rollout.HAS_NUMPY
+        self.seed(seed)
+    
+    def seed(self, seed=None):
+        """Restart the random streams, reproducibly for a given seed (None: from the OS)."""
+        self.rng = random.Random(seed)
+        self.np_rng = batch_rollout.np.random.default_rng(seed) if self.use_numpy else None
         
     def evaluate_win_probabilities(self, game_state, simulations=200):
         """
@@ -26,12 +106,13 @@ class ProbabilityEngine:
         Each value is float between 0 and 1.
         
         Args:
-            game_state: UltimateTicTacToeLogic instance
+            game_state: UltimateTicTacToeLogic or Position
             simulations: Number of Monte Carlo simulations to run
             
         Returns:
             tuple: (win_prob, lose_prob, draw_prob) for current player
         """
+        game_state = as_logic(game_state)
         if game_state.game_over:
             # Game already over, return definitive probabilities
             if game_state.winner == game_state.current_turn:
@@ -41,12 +122,101 @@ class ProbabilityEngine:
             else:
                 return (0.0, 1.0, 0.0)
         
-        wins = 0
-        losses = 0
-        draws = 0
+        wins, losses, draws = self._cached_counts(game_state)
+        missing = simulations - (wins + losses + draws)
+        if missing > 0:
+            wins, losses, draws = self._add_results(game_state, missing, (wins, losses, draws))
+        
+        total = wins + losses + draws
+        win_prob = wins / total
+        lose_prob = losses / total
+        draw_prob = draws / total
         
+        return (win_prob, lose_prob, draw_prob)
+    
+    def iter_win_probabilities(self, game_state, tolerance=0.05, time_slice_ms=None,
+                               batch_size=50, max_simulations=2000):
+        """
+        Anytime evaluation: yields a refined ProbabilityEstimate after every
+        batch of simulations and stops once the estimate is good enough.
+        
+        Args:
+            game_state: UltimateTicTacToeLogic or Position (not modified while iterating)
+            tolerance: Stop when every 95% confidence interval is at most
+                       this far either side of its estimate
+            time_slice_ms: Stop after this much time, or None for no limit
+            batch_size: Simulations between estimates
+            max_simulations: Hard cap on simulations
+            
+        Yields:
+            ProbabilityEstimate: for the current player, the last one is final
+        """
+        game_state = as_logic(game_state)
+        if game_state.game_over:
+            # Decided: exact, no rollouts needed
+            if game_state.winner == game_state.current_turn:
+                yield ProbabilityEstimate(1, 0, 0)
+            elif game_state.winner == "D":
+                yield ProbabilityEstimate(0, 0, 1)
+            else:
+                yield ProbabilityEstimate(0, 1, 0)
+            return
+        
+        deadline = None
+        if time_slice_ms is not None:
+            deadline = time.perf_counter() + time_slice_ms / 1000
+        counts = self._cached_counts(game_state)
+        done = sum(counts)
+        if done:
+            # Start from what earlier evaluations of this position found
+            estimate = ProbabilityEstimate(*counts)
+            yield estimate
+            if estimate.half_width() <= tolerance:
+                return
+        while done < max_simulations:
+            n = min(batch_size, max_simulations - done)
+            counts = self._add_results(game_state, n, counts)
+            done += n
+            estimate = ProbabilityEstimate(*counts)
+            yield estimate
+            if estimate.half_width() <= tolerance:
+                return
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
+    
+    def _cached_counts(self, game_state):
+        """(wins, losses, draws) already simulated for this position, zeros if none"""
+        if self.cache is None:
+            return (0, 0, 0)
+        return self.cache.get(game_state.to_position()) or (0, 0, 0)
+    
+    def _add_results(self, game_state, simulations, counts):
+        """Simulate more games, record them in the cache and return the new totals"""
+        wins, losses, draws = self._count_results(game_state, simulations)
+        if self.cache is not None:
+            self.cache.add(game_state.to_position(), wins, losses, draws)
+        return (counts[0] + wins, counts[1] + losses, counts[2] + draws)
+    
+    def _count_results(self, game_state, simulations):
+        """
+        Play simulations games from a position that is not over.
+        
+        Returns:
+            tuple: (wins, losses, draws) counts for the current player
+        """
         current_player = game_state.current_turn
         
+        if self.use_numpy:
+            x_wins, o_wins, draws = batch_rollout.run_rollouts(
+                game_state, simulations,
+                capture_weight=self.CAPTURED_BOARD_WEIGHT, threat_weight=self.THREAT_WEIGHT,
+                center_weight=self.CENTER_WEIGHT, corner_weight=self.CORNER_WEIGHT,
+                rng=self.np_rng)
+            return (x_wins, o_wins, draws) if current_player == "X" else (o_wins, x_wins, draws)
+        
+        wins = 0
+        losses = 0
+        draws = 0
         for _ in range(simulations):
             result = self._simulate_game(game_state, current_player)
             
@@ -56,13 +226,7 @@ class ProbabilityEngine:
                 draws += 1
             else:
                 losses += 1
-        
-        total = simulations
-        win_prob = wins / total
-        lose_prob = losses / total
-        draw_prob = draws / total
-        
-        return (win_prob, lose_prob, draw_prob)
+        return (wins, losses, draws)
     
     def _simulate_game(self, original_state, original_player):
         """
@@ -100,34 +264,66 @@ class ProbabilityEngine:
         Returns:
             tuple: (board_idx, row, col) or None if no valid moves
         """
-        valid_moves = self._get_valid_moves(state)
-        
-        if not valid_moves:
+        if state.next_board_index != -1:
+            board_idx = state.next_board_index
+            cells, cumulative = self._get_board_weights(state, board_idx)
+        else:
+            boards = [i for i in range(9) if not state.closed & CELL_BITS[i]]
+            if not boards:
+                return None
+            tables = [self._get_board_weights(state, i) for i in boards]
+            # Pick a board by its total weight, then a cell within it
+            totals = [table[1][-1] for table in tables]
+            for k, board_idx in enumerate(boards):
+                if self._creates_big_board_threat(state, board_idx):
+                    totals[k] *= self.THREAT_WEIGHT
+            k = self.rng.choices(range(len(boards)), totals)[0]
+            board_idx = boards[k]
+            cells, cumulative = tables[k]
+        
+        if not cells:
             return None
+        cell = cells[bisect_right(cumulative, self.rng.random() * cumulative[-1])]
+        return (board_idx, cell // 3, cell % 3)
+    
+    def _get_board_weights(self, state, board_idx):
+        """
+        Empty cells of one board and their cumulative move weights.
         
-        # Calculate weights for each move
-        move_weights = []
-        for move in valid_moves:
-            weight = self._evaluate_move_quality(state, move)
-            move_weights.append(weight)
-        
-        # Select move based on weights
-        total_weight = sum(move_weights)
-        if total_weight == 0:
-            # All weights are 0, choose uniformly
-            return random.choice(valid_moves)
-        
-        # Weighted random selection
-        rand_val = random.uniform(0, total_weight)
-        cumulative = 0
-        
-        for move, weight in zip(valid_moves, move_weights):
-            cumulative += weight
-            if rand_val <= cumulative:
-                return move
-        
-        # Fallback (shouldn't reach here)
-        return valid_moves[-1]
+        These are the weights of _evaluate_move_quality without the big-board
+        threat factor, which is the same for every cell of a board. They only
+        depend on the board's cells and on which of the boards they send the
+        opponent to are closed, so they are cached by those.
+        """
+        player = 0 if state.current_turn == "X" else 1
+        own = state.masks[player][board_idx]
+        occupied = own | state.masks[1 - player][board_idx]
+        closed = state.closed & ~occupied
+        key = ((TERNARY[own] + 2 * TERNARY[occupied & ~own]) << 9) | closed
+        
+        table = self._weight_cache.get(key)
+        if table is None:
+            cells = EMPTY_CELLS[occupied]
+            captures = WINNING_CELLS[own]
+            cumulative = []
+            total = 0.0
+            for cell in cells:
+                weight = 1.0
+                if captures & CELL_BITS[cell]:
+                    weight *= self.CAPTURED_BOARD_WEIGHT
+                if cell == 4:
+                    weight *= self.CENTER_WEIGHT
+                elif cell in (0, 2, 6, 8):
+                    weight *= self.CORNER_WEIGHT
+                if closed & CELL_BITS[cell]:
+                    weight *= 1.3
+                total += weight
+                cumulative.append(total)
+            table = (cells, tuple(cumulative))
+            if len(self._weight_cache) >= MAX_CACHED_WEIGHTS:
+                self._weight_cache.clear()
+            self._weight_cache[key] = table
+        return table
     
     def _evaluate_move_quality(self, state, move):
         """
@@ -162,7 +358,7 @@ class ProbabilityEngine:
         
         # Heuristic 5: Avoid sending opponent to already captured boards
         next_board_idx = row * 3 + col
-        if state.board_states[next_board_idx] != "":
+        if state.closed & CELL_BITS[next_board_idx]:
             score *= 1.3  # Slight bonus for giving opponent free choice
         
         return score
@@ -171,41 +367,18 @@ class ProbabilityEngine:
         """
         Check if this move would capture the small board.
         """
-        # Create temporary state to test
-        temp_state = self._copy_game_state(state)
-        temp_state.small_boards[board_idx][row][col] = temp_state.current_turn
-        
-        # Check if this wins the small board
-        winner = temp_state.check_small_board_win(board_idx)
-        return winner == temp_state.current_turn
+        # The masks are kept up to date by make_move, so this is one table lookup
+        player = 0 if state.current_turn == "X" else 1
+        return bool(WINNING_CELLS[state.masks[player][board_idx]] & CELL_BITS[row * 3 + col])
     
     def _creates_big_board_threat(self, state, board_idx):
         """
         Check if capturing this board would create a threat (2 in a row) on big board.
         """
-        # First check if this move can capture the board
-        current_player = state.current_turn
-        
-        # Simulate capturing this board
-        temp_board_states = state.board_states.copy()
-        temp_board_states[board_idx] = current_player
-        
-        # Check for two-in-a-row patterns
-        win_patterns = [
-            (0, 1, 2), (3, 4, 5), (6, 7, 8),  # Rows
-            (0, 3, 6), (1, 4, 7), (2, 5, 8),  # Columns
-            (0, 4, 8), (2, 4, 6)              # Diagonals
-        ]
-        
-        for pattern in win_patterns:
-            player_count = sum(1 for idx in pattern if temp_board_states[idx] == current_player)
-            empty_count = sum(1 for idx in pattern if temp_board_states[idx] == "")
-            
-            # Two of ours and one empty = threat
-            if player_count == 2 and empty_count == 1:
-                return True
-        
-        return False
+        # Depends only on the big board, so it is precomputed for every configuration
+        own = state.big[0 if state.current_turn == "X" else 1]
+        open_boards = FULL_MASK & ~state.closed
+        return bool(BIG_THREATS[TERNARY[own] + 2 * TERNARY[open_boards]] & CELL_BITS[board_idx])
     
     def _is_center_position(self, row, col):
         """Check if position is center of a 3x3 board."""
@@ -230,14 +403,13 @@ class ProbabilityEngine:
             boards_to_check = [state.next_board_index]
         else:
             # Can play in any uncaptured board
-            boards_to_check = [i for i in range(9) if state.board_states[i] == ""]
+            boards_to_check = [i for i in range(9) if not state.closed & CELL_BITS[i]]
         
         # Find all valid cells in allowed boards
         for board_idx in boards_to_check:
-            for row in range(3):
-                for col in range(3):
-                    if state.small_boards[board_idx][row][col] == "":
-                        valid_moves.append((board_idx, row, col))
+            occupied = state.masks[0][board_idx] | state.masks[1][board_idx]
+            for cell in EMPTY_CELLS[occupied]:
+                valid_moves.append((board_idx, cell // 3, cell % 3))
         
         return valid_moves
     
@@ -251,27 +423,7 @@ class ProbabilityEngine:
         Returns:
             UltimateTicTacToeLogic: Deep copy of the state
         """
-        # Import here to avoid circular dependency
-        from states.game import UltimateTicTacToeLogic
-        
-        new_state = UltimateTicTacToeLogic()
-        
-        # Deep copy small boards
-        new_state.small_boards = [
-            [row.copy() for row in board]
-            for board in state.small_boards
-        ]
-        
-        # Copy board states
-        new_state.board_states = state.board_states.copy()
-        
-        # Copy game state variables
-        new_state.current_turn = state.current_turn
-        new_state.next_board_index = state.next_board_index
-        new_state.winner = state.winner
-        new_state.game_over = state.game_over
-        
-        return new_state
+        return state.copy()
 
 
 # Global instance for easy access
@@ -296,3 +448,28 @@ def evaluate_win_probabilities(game_state, simulations=200):
         >>> print(f"Win: {win_prob:.1%}, Lose: {lose_prob:.1%}, Draw: {draw_prob:.1%}")
     """
     return probability_engine.evaluate_win_probabilities(game_state, simulations)
+
+
+def benchmark(simulations=2000, positions=5, seed=1):
+    """Rollout throughput of the one-at-a-time and the batched simulations."""
+    from engine.ultimate_logic import random_position
+
+    rng = random.Random(seed)
+    states = [random_position(rng) for _ in range(positions)]
+
+    engines = [("scalar", ProbabilityEngine(use_numpy=False))]
+    if batch_rollout.HAS_NUMPY:
+        engines.append(("numpy", ProbabilityEngine()))
+    print(f"{simulations} simulations x {positions} positions")
+    print("Engine | Time (s) | Simulations/s")
+    print("-" * 36)
+    for name, engine in engines:
+        start = time.perf_counter()
+        for state in states:
+            engine.evaluate_win_probabilities(state, simulations)
+        elapsed = time.perf_counter() - start
+        print(f"{name:6s} | {elapsed:8.2f} | {simulations * positions / elapsed:13.0f}")
+
+
+if __name__ == "__main__":
+    benchmark()
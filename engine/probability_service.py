@@ -0,0 +1,83 @@
+"""
+Background win-probability evaluation
+Runs the Monte Carlo evaluator in a worker thread so a move never stalls the
+frame loop. Only the most recent position matters: a request that arrives
+while another is waiting replaces it, and a position that has been
+superseded is abandoned between batches and its results thrown away.
+Estimates are published as they are refined, so the bar moves early and
+settles as more simulations come in.
+"""
+
+import threading
+
+from engine.probability_engine import probability_engine
+
+
+class ProbabilityService:
+    """
+    Latest-position-wins probability evaluation in one daemon thread.
+
+    submit() snapshots the position and returns at once; the UI calls
+    take_result() every frame and gets each new estimate once.
+    """
+
+    def __init__(self, engine=None, tolerance=0.05, time_slice_ms=500, max_simulations=2000):
+        self.engine = engine or probability_engine
+        self.tolerance = tolerance
+        self.time_slice_ms = time_slice_ms
+        self.max_simulations = max_simulations
+        self._cond = threading.Condition()
+        self._generation = 0
+        self._pending = None
+        self._result = None
+        self._thread = None
+
+    def submit(self, logic_state):
+        """Queue a position for evaluation, replacing any that has not started yet."""
+        snapshot = logic_state.copy()
+        with self._cond:
+            self._generation += 1
+            self._pending = (self._generation, snapshot)
+            self._cond.notify()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="probability", daemon=True)
+            self._thread.start()
+
+    def clear(self):
+        """Forget queued work and results, e.g. when a new game starts."""
+        with self._cond:
+            self._generation += 1
+            self._pending = None
+            self._result = None
+
+    def take_result(self):
+        """
+        Non-blocking check for a new estimate.
+
+        Returns:
+            ProbabilityEstimate: the newest estimate for the latest submitted
+                                 position, None if there is nothing new
+        """
+        with self._cond:
+            result, self._result = self._result, None
+        return result
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._pending is None:
+                    self._cond.wait()
+                generation, state = self._pending
+                self._pending = None
+            try:
+                estimates = self.engine.iter_win_probabilities(
+                    state, tolerance=self.tolerance, time_slice_ms=self.time_slice_ms,
+                    max_simulations=self.max_simulations)
+                for estimate in estimates:
+                    with self._cond:
+                        if generation != self._generation:
+                            # A newer position was submitted, drop this one
+                            break
+                        self._result = estimate
+            except Exception as e:
+                print(f"Probability evaluation failed: {e}")
@@ -0,0 +1,64 @@
+"""
+Persistent worker process pools
+Shared by the engines that spread work over processes (root-parallel search,
+parallel rollouts, tournaments). Pools use the spawn start method and can be
+brought fully up before the first task so no search pays for process start-up.
+"""
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, wait
+
+
+def spawn_context():
+    # Spawn rather than fork: the game process runs pygame and helper threads
+    return multiprocessing.get_context("spawn")
+
+
+def _ping():
+    return os.getpid()
+
+
+def spawn_pool(workers, initializer=None, initargs=(), warm=True):
+    """
+    ProcessPoolExecutor on the spawn context.
+
+    Args:
+        warm: Block until every worker process is running; processes start
+              lazily otherwise, and the first tasks would pay for it
+    """
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=spawn_context(),
+                               initializer=initializer, initargs=initargs)
+    if warm:
+        wait([pool.submit(_ping) for _ in range(workers)])
+    return pool
+
+
+def benchmark_worker_counts():
+    """Worker counts worth timing on this machine: 1, 2, 4, 8 and all CPUs."""
+    cores = os.cpu_count() or 1
+    return sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+
+
+class PersistentPool:
+    """
+    Mixin for an engine that keeps a process pool across calls. Subclasses
+    set self.workers and implement pool_initializer().
+    """
+    pool = None
+
+    def pool_initializer(self):
+        """Returns (initializer, initargs) for the worker processes."""
+        return None, ()
+
+    def start_pool(self):
+        """Start the worker processes (blocks until they are up). Safe to call again."""
+        if self.pool is not None:
+            return
+        initializer, initargs = self.pool_initializer()
+        self.pool = spawn_pool(self.workers, initializer, initargs)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            self.pool = None
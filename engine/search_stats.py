@@ -0,0 +1,109 @@
+"""
+Per-search statistics
+Every AI search fills in one SearchStats: what was played, how deep and how
+fast the search went and how well pruning and the transposition table
+worked. The AI keeps the latest one as last_stats, returns it from search()
+and hands it to its on_search hook, if one is set. Collecting it only
+reads counters the search keeps anyway, so it can stay on in normal play.
+"""
+
+
+class SearchStats:
+    """
+    Summary of one search.
+
+    Fields an engine does not have (an MCTS search has no TT or cutoffs) are
+    left at None.
+    """
+
+    def __init__(self, engine, move=None, score=None, depth=0, nodes=0, elapsed_ms=0.0,
+                 tt_hit_rate=None, beta_cutoffs=None, first_move_cutoffs=None,
+                 iteration_nodes=(), pv=(), workers=1, details=None):
+        self.engine = engine
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed_ms = elapsed_ms
+        self.tt_hit_rate = tt_hit_rate
+        self.beta_cutoffs = beta_cutoffs
+        self.first_move_cutoffs = first_move_cutoffs
+        # Nodes searched by each completed iterative-deepening step
+        self.iteration_nodes = list(iteration_nodes)
+        self.pv = list(pv)
+        self.workers = workers
+        # Engine-specific extras, e.g. tree size for MCTS
+        self.details = details or {}
+
+    @property
+    def nps(self):
+        """Nodes per second."""
+        if self.elapsed_ms <= 0:
+            return 0.0
+        return self.nodes * 1000.0 / self.elapsed_ms
+
+    @property
+    def branching_factor(self):
+        """
+        Effective branching factor per ply. Taken over the last two
+        completed iterations, since alpha-beta alternates cheap and
+        expensive depths; None without iteration data.
+        """
+        counts = [n for n in self.iteration_nodes if n]
+        if len(counts) >= 3:
+            return (counts[-1] / counts[-3]) ** 0.5
+        if len(counts) == 2:
+            return counts[-1] / counts[-2]
+        if counts and self.depth:
+            return counts[-1] ** (1.0 / self.depth)
+        return None
+
+    @property
+    def first_move_cutoff_rate(self):
+        if not self.beta_cutoffs:
+            return 0.0
+        return self.first_move_cutoffs / self.beta_cutoffs
+
+    def as_dict(self):
+        return {
+            "engine": self.engine,
+            "move": self.move,
+            "score": self.score,
+            "depth": self.depth,
+            "nodes": self.nodes,
+            "elapsed_ms": self.elapsed_ms,
+            "nps": self.nps,
+            "tt_hit_rate": self.tt_hit_rate,
+            "beta_cutoffs": self.beta_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "branching_factor": self.branching_factor,
+            "pv": self.pv,
+            "workers": self.workers,
+            **self.details,
+        }
+
+    def summary(self):
+        """One line for the console."""
+        parts = [f"{self.engine}: {self.move}", f"score {self.score}", f"depth {self.depth}",
+                 f"nodes {self.nodes}", f"{self.elapsed_ms:.0f} ms", f"{self.nps / 1000:.0f}k nps"]
+        if self.tt_hit_rate is not None:
+            parts.append(f"TT {self.tt_hit_rate:.0%}")
+        if self.beta_cutoffs is not None:
+            parts.append(f"cutoffs {self.beta_cutoffs} ({self.first_move_cutoff_rate:.0%} first)")
+        branching = self.branching_factor
+        if branching is not None:
+            parts.append(f"EBF {branching:.1f}")
+        if self.workers > 1:
+            parts.append(f"workers {self.workers}")
+        parts.extend(f"{name} {value}" for name, value in self.details.items())
+        if self.pv:
+            parts.append("PV " + " ".join(f"{b}:{r}{c}" for b, r, c in self.pv))
+        return " | ".join(parts)
+
+    def __repr__(self):
+        return f"SearchStats({self.summary()})"
+
+
+def log_search_stats(stats):
+    """on_search hook that prints the summary line."""
+    print(stats.summary())
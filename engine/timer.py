@@ -113,6 +113,21 @@ class GameTimer:
             return self.player2_time_ms
         return 0
     
+    def get_move_budget_ms(self, player, moves_left=20, reserve_ms=1000):
+        """
+        Thinking time for one move of a player
+        Args:
+            player: 1 or 2
+            moves_left: Expected number of moves still to play
+            reserve_ms: Time kept back so the clock never runs out
+        Returns:
+            An even share of the remaining time above the reserve,
+            never more than half of what is left
+        """
+        remaining = self.get_time_ms(player)
+        budget = (remaining - reserve_ms) / moves_left
+        return max(0, min(budget, remaining / 2))
+    
     def reset(self):
         """Reset the timer to initial state"""
         self.player1_time_ms = 0
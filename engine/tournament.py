@@ -0,0 +1,309 @@
+"""
+Headless engine-vs-engine matches
+Plays many games between two engine settings across a process pool, to tune
+search depth and evaluation weights without going through the UI. Games come
+in pairs that start from the same random opening with colours swapped, so
+neither side profits from a lucky opening or from moving first.
+
+Run as a script:
+    python -m engine.tournament minimax:depth=4,two=12 minimax:depth=4 --games 400
+    python -m engine.tournament minimax mcts:iterations=3000 --move-ms 200
+    python -m engine.tournament rollout:threat=3.5 rollout --games 200
+
+A player is an engine name with optional key=value settings:
+    minimax   depth, tt_mb and the (integer) evaluation weights of DEFAULT_WEIGHTS
+    mcts      iterations, exploration, max_nodes
+    rollout   simulations and the ProbabilityEngine move weights capture,
+              threat, center, corner
+"""
+
+import argparse
+import math
+import os
+import random
+import time
+
+from engine.ai_mcts import MCTSAI
+from engine.ai_minimax import DEFAULT_WEIGHTS, MinimaxAI
+from engine.probability_engine import ProbabilityEngine
+from engine.process_pool import spawn_pool
+from engine.ultimate_logic import random_position
+
+ENGINES = ("minimax", "mcts", "rollout")
+
+
+class RolloutPlayer:
+    """
+    Flat Monte Carlo player: plays the move after which its rollouts, guided
+    by the ProbabilityEngine move weights, score best. Lets those weights be
+    compared by playing strength.
+    """
+
+    def __init__(self, simulations=100, capture=None, threat=None, center=None, corner=None, seed=None):
+        self.simulations = simulations
+        self.engine = ProbabilityEngine(seed=seed, cache_mb=0)
+        for attr, value in (("CAPTURED_BOARD_WEIGHT", capture), ("THREAT_WEIGHT", threat),
+                            ("CENTER_WEIGHT", center), ("CORNER_WEIGHT", corner)):
+            if value is not None:
+                setattr(self.engine, attr, value)
+
+    def get_best_move(self, logic_state, deadline=None, cancel=None):
+        """Best move by rollouts; runs a fixed number of simulations, the deadline is not used."""
+        state = logic_state.copy()
+        best_move = None
+        best_score = -1.0
+        for move in state.get_legal_moves():
+            state.make_move(*move)
+            if state.game_over:
+                score = 0.5 if state.winner == "D" else 1.0
+            else:
+                # Probabilities are for the opponent, who is now to move
+                win, lose, draw = self.engine.evaluate_win_probabilities(state, self.simulations)
+                score = lose + draw / 2
+            state.unmake_move()
+            if score > best_score:
+                best_move, best_score = move, score
+        return best_move
+
+
+def parse_player(text):
+    """
+    Parse a player spec such as "minimax:depth=4,two=12".
+
+    Returns:
+        tuple: (engine name, dict of settings)
+    """
+    name, _, settings = text.partition(":")
+    if name not in ENGINES:
+        raise ValueError(f"Unknown engine {name!r}, expected one of {', '.join(ENGINES)}")
+    params = {}
+    for item in filter(None, settings.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Expected key=value in {text!r}, got {item!r}")
+        params[key.strip()] = _number(value.strip())
+    return name, params
+
+
+def _number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def make_player(text, seed=None):
+    """A fresh engine for a player spec."""
+    name, params = parse_player(text)
+    if name == "minimax":
+        weights = {key: params.pop(key) for key in DEFAULT_WEIGHTS if key in params}
+        depth = params.pop("depth", 4)
+        tt_size_mb = params.pop("tt_mb", 16)
+        if params:
+            raise ValueError(f"Unknown minimax settings: {sorted(params)}")
+        return MinimaxAI(depth=depth, tt_size_mb=tt_size_mb, weights=weights)
+    if name == "mcts":
+        return MCTSAI(**params)
+    return RolloutPlayer(seed=seed, **params)
+
+
+def play_game(player_a, player_b, a_plays_x, seed, opening_plies=4, move_time_ms=None):
+    """
+    Play one game between two player specs.
+
+    Returns:
+        tuple: (score of A: 1, 0.5 or 0, A's thinking seconds, A's moves,
+                B's thinking seconds, B's moves)
+    """
+    rng = random.Random(seed)
+    state = random_position(rng, opening_plies, opening_plies)
+    # MinimaxAI and MCTSAI break ties with the global random module
+    random.seed(seed)
+    engines = {"X": make_player(player_a if a_plays_x else player_b, seed),
+               "O": make_player(player_b if a_plays_x else player_a, seed)}
+    a_side = "X" if a_plays_x else "O"
+    thinking = {"X": 0.0, "O": 0.0}
+    moves = {"X": 0, "O": 0}
+
+    while not state.game_over:
+        side = state.current_turn
+        start = time.perf_counter()
+        deadline = start + move_time_ms / 1000 if move_time_ms else None
+        move = engines[side].get_best_move(state, deadline)
+        thinking[side] += time.perf_counter() - start
+        moves[side] += 1
+        if move is None or not state.make_move(*move):
+            raise RuntimeError(f"{engines[side].__class__.__name__} played illegal move {move}")
+
+    score = game_score(state, a_side)
+    b_side = "O" if a_plays_x else "X"
+    return (score, thinking[a_side], moves[a_side], thinking[b_side], moves[b_side])
+
+
+def game_score(state, side):
+    """Points of side ("X" or "O") in a finished game: 1, 0.5 for a draw, 0."""
+    if state.winner == "D":
+        return 0.5
+    return 1.0 if state.winner == side else 0.0
+
+
+def _play_task(task):
+    return play_game(*task)
+
+
+def elo_difference(score):
+    """Elo difference that gives an expected score (0..1); infinite at 0 and 1."""
+    if score <= 0:
+        return -math.inf
+    if score >= 1:
+        return math.inf
+    return 400 * math.log10(score / (1 - score))
+
+
+class MatchResult:
+    """Win/draw/loss and thinking time of player A against player B."""
+
+    def __init__(self, player_a, player_b):
+        self.player_a = player_a
+        self.player_b = player_b
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.time_a = 0.0
+        self.moves_a = 0
+        self.time_b = 0.0
+        self.moves_b = 0
+
+    def add(self, game):
+        score, time_a, moves_a, time_b, moves_b = game
+        if score == 1:
+            self.wins += 1
+        elif score == 0:
+            self.losses += 1
+        else:
+            self.draws += 1
+        self.time_a += time_a
+        self.moves_a += moves_a
+        self.time_b += time_b
+        self.moves_b += moves_b
+
+    @property
+    def games(self):
+        return self.wins + self.draws + self.losses
+
+    @property
+    def score(self):
+        """Points per game of A, 0..1."""
+        if not self.games:
+            return 0.5
+        return (self.wins + self.draws / 2) / self.games
+
+    def elo(self):
+        """Elo difference of A over B."""
+        return elo_difference(self.score)
+
+    def elo_error(self, z=1.96):
+        """
+        Half-width of the confidence interval of elo(), from the standard
+        error of the per-game score (z=1.96: 95%). Infinite while the
+        interval reaches a score of 0 or 1.
+        """
+        n = self.games
+        if not n:
+            return math.inf
+        s = self.score
+        variance = (self.wins * (1 - s) ** 2 + self.draws * (0.5 - s) ** 2 + self.losses * s ** 2) / n
+        margin = z * math.sqrt(variance / n)
+        low, high = s - margin, s + margin
+        if low <= 0 or high >= 1:
+            return math.inf
+        return (elo_difference(high) - elo_difference(low)) / 2
+
+    def ms_per_move(self):
+        """Average thinking time per move of A and of B, in ms."""
+        return (self.time_a * 1000 / max(1, self.moves_a), self.time_b * 1000 / max(1, self.moves_b))
+
+    def summary(self):
+        ms_a, ms_b = self.ms_per_move()
+        return "\n".join([
+            f"{self.player_a} vs {self.player_b}: {self.games} games",
+            f"W {self.wins}  D {self.draws}  L {self.losses}  score {self.score:.1%}",
+            f"Elo {self.elo():+.0f} +/- {self.elo_error():.0f} (95%)",
+            f"ms/move  A {ms_a:.1f}  B {ms_b:.1f}",
+        ])
+
+
+def run_match(player_a, player_b, games=100, workers=None, opening_plies=4, move_time_ms=None,
+              seed=1, progress=None):
+    """
+    Play games between two player specs, in worker processes when workers > 1.
+
+    Args:
+        player_a, player_b: Player specs, see parse_player
+        games: Number of games; consecutive pairs share an opening, colours swapped
+        workers: Processes, None for one per CPU
+        opening_plies: Random moves played before the engines take over
+        move_time_ms: Thinking time per move, or None to search each engine's fixed budget
+        seed: Seed of the openings and the engines' random choices
+        progress: Optional callable, given the MatchResult after every game
+
+    Returns:
+        MatchResult: from player A's side
+    """
+    # Fail here rather than in every worker
+    for spec in (player_a, player_b):
+        make_player(spec)
+
+    rng = random.Random(seed)
+    tasks = []
+    while len(tasks) < games:
+        game_seed = rng.getrandbits(32)
+        tasks.append((player_a, player_b, True, game_seed, opening_plies, move_time_ms))
+        tasks.append((player_a, player_b, False, game_seed, opening_plies, move_time_ms))
+    tasks = tasks[:games]
+
+    result = MatchResult(player_a, player_b)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1:
+        for task in tasks:
+            result.add(_play_task(task))
+            if progress:
+                progress(result)
+        return result
+
+    # Worker start-up is a small part of a match, no need to wait for it
+    with spawn_pool(workers, warm=False) as pool:
+        for game in pool.map(_play_task, tasks, chunksize=max(1, games // (workers * 8))):
+            result.add(game)
+            if progress:
+                progress(result)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Engine-vs-engine matches for Ultimate Tic-Tac-Toe")
+    parser.add_argument("player_a", help='e.g. "minimax:depth=4,two=12"')
+    parser.add_argument("player_b", help='e.g. "mcts:iterations=2000"')
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per CPU)")
+    parser.add_argument("--openings", type=int, default=4, help="random plies before the engines play")
+    parser.add_argument("--move-ms", type=int, default=None, help="thinking time per move")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    step = max(1, args.games // 10)
+
+    def progress(result):
+        if result.games % step == 0 and result.games < args.games:
+            print(f"{result.games}/{args.games}  W {result.wins}  D {result.draws}  L {result.losses}"
+                  f"  Elo {result.elo():+.0f} +/- {result.elo_error():.0f}")
+
+    start = time.perf_counter()
+    result = run_match(args.player_a, args.player_b, args.games, args.workers, args.openings,
+                       args.move_ms, args.seed, progress)
+    print(result.summary())
+    print(f"Finished in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Transposition table for the minimax search
+Fixed-size hash table keyed by the 64-bit Zobrist key of a position.
+Entries live in typed arrays so the memory budget is exact: 16 bytes per
+slot (8 byte key, 4 byte score, 4 byte packed depth/bound/move/age).
+"""
+
+from array import array
+
+# Bound types
+EXACT = 0
+LOWER = 1  # Score is at least this value (fail high)
+UPPER = 2  # Score is at most this value (fail low)
+
+BYTES_PER_ENTRY = 16
+
+# Packed layout of the info word: depth 8 bits | bound 2 bits | move 7 bits | age 8 bits
+_DEPTH_SHIFT = 17
+_BOUND_SHIFT = 15
+_MOVE_SHIFT = 8
+
+
+class TranspositionTable:
+    """
+    Depth-preferred transposition table with aging.
+    A stored entry is replaced when the new one comes from a newer search or
+    was searched at least as deep. This holds for the same position too: a
+    shallower result from the current search keeps the deeper entry.
+    """
+
+    def __init__(self, size_mb=16):
+        # Largest power of two that fits the budget, so indexing is a mask
+        slots = max(1, int(size_mb * 1024 * 1024) // BYTES_PER_ENTRY)
+        self.size = 1 << (slots.bit_length() - 1)
+        self.mask = self.size - 1
+        self.size_mb = size_mb
+
+        self.keys = array("Q", bytes(8 * self.size))
+        self.scores = array("i", bytes(4 * self.size))
+        self.info = array("I", bytes(4 * self.size))
+        self.age = 1
+
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.overwrites = 0
+        self.rejected = 0
+
+    def new_search(self):
+        """Advance the age so entries from older searches become replaceable."""
+        self.age = self.age % 255 + 1
+
+    def clear(self):
+        self.keys = array("Q", bytes(8 * self.size))
+        self.scores = array("i", bytes(4 * self.size))
+        self.info = array("I", bytes(4 * self.size))
+        self.age = 1
+
+    def probe(self, key):
+        """
+        Look up a position.
+
+        Returns:
+            tuple: (depth, bound, score, move) or None on a miss.
+                   move is (board_idx, row, col) or None.
+        """
+        idx = key & self.mask
+        info = self.info[idx]
+        if info and self.keys[idx] == key:
+            self.hits += 1
+            move_code = (info >> _MOVE_SHIFT) & 0x7F
+            move = None
+            if move_code:
+                board_idx, cell = divmod(move_code - 1, 9)
+                move = (board_idx, cell // 3, cell % 3)
+            return (info >> _DEPTH_SHIFT, (info >> _BOUND_SHIFT) & 0x3, self.scores[idx], move)
+        if info:
+            # Slot holds a different position
+            self.collisions += 1
+        self.misses += 1
+        return None
+
+    def store(self, key, depth, bound, score, move):
+        idx = key & self.mask
+        info = self.info[idx]
+        if info:
+            old_depth = info >> _DEPTH_SHIFT
+            old_age = info & 0xFF
+            if old_age == self.age and depth < old_depth:
+                self.rejected += 1
+                return
+            if self.keys[idx] != key:
+                self.overwrites += 1
+
+        move_code = 0
+        if move is not None:
+            board_idx, row, col = move
+            move_code = board_idx * 9 + row * 3 + col + 1
+
+        self.keys[idx] = key
+        self.scores[idx] = int(score)
+        self.info[idx] = (min(depth, 255) << _DEPTH_SHIFT) | (bound << _BOUND_SHIFT) | (move_code << _MOVE_SHIFT) | self.age
+        self.stores += 1
+
+    def used(self):
+        """Number of occupied slots (walks the whole table, not for the hot path)."""
+        return self.size - self.info.count(0)
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            "size_mb": self.size_mb,
+            "slots": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collisions": self.collisions,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "rejected": self.rejected,
+        }
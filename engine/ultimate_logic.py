@@ -1,8 +1,344 @@
 """
 Ultimate Tic Tac Toe - Game Logic
 Handles the core rules and state of the Ultimate Tic Tac Toe game.
+Boards are kept as bitboards (see engine.bitboard); the views below give the
+familiar small_boards[b][r][c] / board_states[i] string access on top of them.
+Pure Python with no pygame dependency, so search workers, benchmarks and
+tests can use it without starting the UI.
 """
 
-class UltimateTicTacToe:
+from engine.bitboard import BOARD_STATUS, CELL_BITS, EMPTY_CELLS, FULL_MASK, IS_FULL, IS_WIN, TERNARY
+from engine.position import Position
+from engine.zobrist import ZOBRIST_CELLS, ZOBRIST_NEXT, ZOBRIST_SIDE
+
+
+class _CellRowView:
+    """Row of a small board, read/written as "" / "X" / "O" strings."""
+    __slots__ = ("logic", "board_idx", "row")
+
+    def __init__(self, logic, board_idx, row):
+        self.logic = logic
+        self.board_idx = board_idx
+        self.row = row
+
+    def __getitem__(self, col):
+        return self.logic.get_cell(self.board_idx, self.row * 3 + col)
+
+    def __setitem__(self, col, value):
+        self.logic.set_cell(self.board_idx, self.row * 3 + col, value)
+
+    def __iter__(self):
+        return (self[c] for c in range(3))
+
+    def __len__(self):
+        return 3
+
+    def copy(self):
+        return list(self)
+
+
+class _SmallBoardView:
+    """One small board as a 3x3 grid of rows."""
+    __slots__ = ("logic", "board_idx")
+
+    def __init__(self, logic, board_idx):
+        self.logic = logic
+        self.board_idx = board_idx
+
+    def __getitem__(self, row):
+        return _CellRowView(self.logic, self.board_idx, row)
+
+    def __iter__(self):
+        return (self[r] for r in range(3))
+
+    def __len__(self):
+        return 3
+
+
+class _SmallBoardsView:
+    """small_boards[board][row][col] compatible view over the bitboards."""
+    __slots__ = ("logic",)
+
+    def __init__(self, logic):
+        self.logic = logic
+
+    def __getitem__(self, board_idx):
+        return _SmallBoardView(self.logic, board_idx)
+
+    def __iter__(self):
+        return (self[b] for b in range(9))
+
+    def __len__(self):
+        return 9
+
+
+class _BoardStatesView:
+    """board_states[i] compatible view: "" (playing), "X", "O", "D" (Draw)."""
+    __slots__ = ("logic",)
+
+    def __init__(self, logic):
+        self.logic = logic
+
+    def __getitem__(self, board_idx):
+        return self.logic.get_board_state(board_idx)
+
+    def __setitem__(self, board_idx, value):
+        self.logic.set_board_state(board_idx, value)
+
+    def __iter__(self):
+        return (self.logic.get_board_state(i) for i in range(9))
+
+    def __len__(self):
+        return 9
+
+    def __contains__(self, value):
+        return any(state == value for state in self)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def copy(self):
+        return list(self)
+
+
+class UltimateTicTacToeLogic:
     def __init__(self):
-        pass
+        # One 9-bit mask per player per small board (index 0 = X, 1 = O)
+        self.masks = [[0] * 9, [0] * 9]
+        # Big board: boards won per player, drawn boards, and all closed boards
+        self.big = [0, 0]
+        self.big_draw = 0
+        self.closed = 0
+        # Zobrist hash of the cell contents, updated on every move
+        self.cell_hash = 0
+        
+        self.current_turn = "X"
+        self.next_board_index = -1 
+        self.winner = None
+        self.game_over = False
+        # Undo records pushed by make_move, popped by unmake_move
+        self.history = []
+
+    # --- List-style views kept for the UI and older callers ---
+
+    @property
+    def small_boards(self):
+        return _SmallBoardsView(self)
+
+    @small_boards.setter
+    def small_boards(self, boards):
+        for b in range(9):
+            for r in range(3):
+                for c in range(3):
+                    self.set_cell(b, r * 3 + c, boards[b][r][c])
+
+    @property
+    def board_states(self):
+        return _BoardStatesView(self)
+
+    @board_states.setter
+    def board_states(self, states):
+        for i in range(9):
+            self.set_board_state(i, states[i])
+
+    def get_cell(self, board_idx, cell):
+        bit = CELL_BITS[cell]
+        if self.masks[0][board_idx] & bit: return "X"
+        if self.masks[1][board_idx] & bit: return "O"
+        return ""
+
+    def set_cell(self, board_idx, cell, value):
+        bit = CELL_BITS[cell]
+        for player in (0, 1):
+            if self.masks[player][board_idx] & bit:
+                self.masks[player][board_idx] &= ~bit
+                self.cell_hash ^= ZOBRIST_CELLS[player][board_idx][cell]
+        if value in ("X", "O"):
+            player = 0 if value == "X" else 1
+            self.masks[player][board_idx] |= bit
+            self.cell_hash ^= ZOBRIST_CELLS[player][board_idx][cell]
+
+    def get_board_state(self, board_idx):
+        bit = CELL_BITS[board_idx]
+        if not self.closed & bit: return ""
+        if self.big[0] & bit: return "X"
+        if self.big[1] & bit: return "O"
+        return "D"
+
+    def set_board_state(self, board_idx, value):
+        bit = CELL_BITS[board_idx]
+        self.big[0] &= ~bit
+        self.big[1] &= ~bit
+        self.big_draw &= ~bit
+        if value == "X": self.big[0] |= bit
+        elif value == "O": self.big[1] |= bit
+        elif value == "D": self.big_draw |= bit
+        self.closed = self.big[0] | self.big[1] | self.big_draw
+
+    @property
+    def zobrist_key(self):
+        """64-bit key covering cell contents, side to move and the forced board."""
+        key = self.cell_hash ^ ZOBRIST_NEXT[self.next_board_index + 1]
+        if self.current_turn == "O": key ^= ZOBRIST_SIDE
+        return key
+
+    def cells(self, board_idx):
+        """Flat list of the 9 cells of a small board."""
+        x = self.masks[0][board_idx]
+        o = self.masks[1][board_idx]
+        return ["X" if x & bit else "O" if o & bit else "" for bit in CELL_BITS]
+
+    def copy(self):
+        new_state = UltimateTicTacToeLogic.__new__(UltimateTicTacToeLogic)
+        new_state.masks = [self.masks[0][:], self.masks[1][:]]
+        new_state.big = self.big[:]
+        new_state.big_draw = self.big_draw
+        new_state.closed = self.closed
+        new_state.cell_hash = self.cell_hash
+        new_state.current_turn = self.current_turn
+        new_state.next_board_index = self.next_board_index
+        new_state.winner = self.winner
+        new_state.game_over = self.game_over
+        new_state.history = self.history[:]
+        return new_state
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def to_position(self):
+        """Immutable snapshot of the position (without move history)."""
+        return Position.pack(self.masks[0], self.masks[1], self.big[0], self.big[1], self.big_draw,
+                             0 if self.current_turn == "X" else 1, self.next_board_index,
+                             self.zobrist_key)
+
+    @classmethod
+    def from_position(cls, position):
+        """Rebuild a game from a Position, with an empty move history."""
+        state = cls()
+        state.masks = [position.x_masks(), position.o_masks()]
+        state.big = [position.big_x, position.big_o]
+        state.big_draw = position.big_draw
+        state.closed = state.big[0] | state.big[1] | state.big_draw
+        state.current_turn = "X" if position.side == 0 else "O"
+        state.next_board_index = position.next_board_index
+        # The key only adds the side and forced board to the cell hash
+        state.cell_hash = position.key ^ ZOBRIST_NEXT[state.next_board_index + 1]
+        if position.side: state.cell_hash ^= ZOBRIST_SIDE
+        state.winner = state.check_big_board_win()
+        state.game_over = state.winner is not None
+        return state
+
+    # --- Rules ---
+
+    def check_small_board_win(self, board_index):
+        return BOARD_STATUS[TERNARY[self.masks[0][board_index]] + 2 * TERNARY[self.masks[1][board_index]]]
+
+    def check_big_board_win(self):
+        if IS_WIN[self.big[0]]: return "X"
+        if IS_WIN[self.big[1]]: return "O"
+        if self.closed == FULL_MASK: return "D"
+        return None
+
+    def get_legal_moves(self):
+        if self.game_over: return []
+        if self.next_board_index != -1:
+            boards = (self.next_board_index,)
+        else:
+            boards = [i for i in range(9) if not self.closed & CELL_BITS[i]]
+        moves = []
+        for b in boards:
+            for cell in EMPTY_CELLS[self.masks[0][b] | self.masks[1][b]]:
+                moves.append((b, cell // 3, cell % 3))
+        return moves
+
+    def make_move(self, board_idx, row, col):
+        if self.game_over: return False
+        if self.next_board_index != -1 and board_idx != self.next_board_index: return False
+        if self.closed & CELL_BITS[board_idx]: return False
+        cell = row * 3 + col
+        bit = CELL_BITS[cell]
+        masks = self.masks
+        if (masks[0][board_idx] | masks[1][board_idx]) & bit: return False
+        
+        player = 0 if self.current_turn == "X" else 1
+        self.history.append((board_idx, cell, player, self.big[player], self.big_draw, self.closed,
+                             self.current_turn, self.next_board_index, self.winner, self.game_over))
+        mask = masks[player][board_idx] | bit
+        masks[player][board_idx] = mask
+        self.cell_hash ^= ZOBRIST_CELLS[player][board_idx][cell]
+        # Only the mover can complete a line with this move
+        board_bit = CELL_BITS[board_idx]
+        if IS_WIN[mask]:
+            self.big[player] |= board_bit
+            self.closed |= board_bit
+            if IS_WIN[self.big[player]]:
+                self.winner = self.current_turn
+                self.game_over = True
+                return True
+        elif IS_FULL[mask | masks[1 - player][board_idx]]:
+            self.big_draw |= board_bit
+            self.closed |= board_bit
+        
+        if self.closed == FULL_MASK:
+            self.winner = "D"
+            self.game_over = True
+            return True
+            
+        self.current_turn = "O" if self.current_turn == "X" else "X"
+        next_idx = cell
+        if self.closed & CELL_BITS[next_idx]: self.next_board_index = -1
+        else: self.next_board_index = next_idx
+        return True
+
+    def unmake_move(self):
+        """Undo the last successful make_move. Returns False if there is nothing to undo."""
+        if not self.history: return False
+        (board_idx, cell, player, big_own, big_draw, closed,
+         turn, next_idx, winner, game_over) = self.history.pop()
+        self.masks[player][board_idx] &= ~CELL_BITS[cell]
+        self.cell_hash ^= ZOBRIST_CELLS[player][board_idx][cell]
+        self.big[player] = big_own
+        self.big_draw = big_draw
+        self.closed = closed
+        self.current_turn = turn
+        self.next_board_index = next_idx
+        self.winner = winner
+        self.game_over = game_over
+        return True
+
+
+def as_logic(state):
+    """Accept a Position or an UltimateTicTacToeLogic, returning game logic."""
+    if isinstance(state, Position):
+        return UltimateTicTacToeLogic.from_position(state)
+    return state
+
+
+def random_position(rng, min_plies=0, max_plies=19, side=None):
+    """
+    A game still in progress after between min_plies and max_plies random
+    moves (inclusive), for benchmarks and openings.
+
+    Args:
+        rng: random.Random to draw the moves from
+        side: "X" or "O" to require that side to be on move, or None
+
+    Raises:
+        ValueError: side can't be on move after min_plies..max_plies moves
+    """
+    if side is not None:
+        # X is on move after an even number of plies
+        parity = 0 if side == "X" else 1
+        if not any(plies % 2 == parity for plies in range(min_plies, max_plies + 1)):
+            raise ValueError(f"{side} is never on move after {min_plies}..{max_plies} plies")
+    while True:
+        state = UltimateTicTacToeLogic()
+        for _ in range(rng.randint(min_plies, max_plies)):
+            state.make_move(*rng.choice(state.get_legal_moves()))
+            if state.game_over:
+                break
+        if not state.game_over and side in (None, state.current_turn):
+            return state
@@ -0,0 +1,23 @@
+"""
+Zobrist keys for Ultimate Tic-Tac-Toe positions
+A position key is the XOR of one 64-bit random number per occupied cell,
+plus one for the side to move and one for the forced next board.
+The generator is seeded with a constant so keys are identical in every
+process (worker pools, caches and opening books can share them).
+"""
+
+import random
+
+_rng = random.Random(0x5EED_0DD5)
+
+# ZOBRIST_CELLS[player][board_idx][cell] with player 0 = X, 1 = O
+ZOBRIST_CELLS = tuple(
+    tuple(tuple(_rng.getrandbits(64) for _ in range(9)) for _ in range(9))
+    for _ in range(2)
+)
+
+# XORed in when O is to move
+ZOBRIST_SIDE = _rng.getrandbits(64)
+
+# ZOBRIST_NEXT[next_board_index + 1], index 0 is a free move (-1)
+ZOBRIST_NEXT = tuple(_rng.getrandbits(64) for _ in range(10))
@@ -1,78 +1,24 @@
 import pygame
 import os
+import time
 import config
 from config import *
 from ui.ui_button import UIButton
 from engine.ai_minimax import MinimaxAI
+from engine.ai_mcts import MCTSAI
+from engine.ai_worker import AISearchTask
+from engine.parallel_search import ParallelMinimaxAI
+from engine.ponder import Ponderer
+from engine.parallel_rollouts import ParallelProbabilityEngine
+from engine.probability_engine import ProbabilityEngine
+from engine.probability_service import ProbabilityService
+from engine.search_stats import log_search_stats
+from engine.ultimate_logic import UltimateTicTacToeLogic
 from engine.sound_manager import sound
 from engine.themes import theme_manager
 from engine.timer import game_timer
-import threading
 from ui.tween import tweener
 
-class UltimateTicTacToeLogic:
-    def __init__(self):
-        # 9 small boards, each 3x3
-        self.small_boards = [[["" for _ in range(3)] for _ in range(3)] for _ in range(9)]
-        # State of small boards: "" (playing), "X", "O", "D" (Draw)
-        self.board_states = ["" for _ in range(9)]
-        
-        self.current_turn = "X"
-        self.next_board_index = -1 
-        self.winner = None
-        self.game_over = False
-
-    def check_small_board_win(self, board_index):
-        b = self.small_boards[board_index]
-        # Check rows
-        for row in range(3):
-            if b[row][0] == b[row][1] == b[row][2] and b[row][0] != "": return b[row][0]
-        # Check cols
-        for col in range(3):
-            if b[0][col] == b[1][col] == b[2][col] and b[0][col] != "": return b[0][col]
-        # Check diagonals
-        if b[0][0] == b[1][1] == b[2][2] and b[0][0] != "": return b[0][0]
-        if b[0][2] == b[1][1] == b[2][0] and b[0][2] != "": return b[0][2]
-        # Check Draw
-        is_full = True
-        for r in range(3):
-            for c in range(3):
-                if b[r][c] == "":
-                    is_full = False
-                    break
-        if is_full: return "D"
-        return ""
-
-    def check_big_board_win(self):
-        b = self.board_states
-        wins = [(0,1,2), (3,4,5), (6,7,8), (0,3,6), (1,4,7), (2,5,8), (0,4,8), (2,4,6)]
-        for p in wins:
-            if b[p[0]] == b[p[1]] == b[p[2]] and b[p[0]] in ["X", "O"]: return b[p[0]]
-        if "" not in b: return "D"
-        return None
-
-    def make_move(self, board_idx, row, col):
-        if self.game_over: return False
-        if self.next_board_index != -1 and board_idx != self.next_board_index: return False
-        if self.board_states[board_idx] != "": return False
-        if self.small_boards[board_idx][row][col] != "": return False
-        
-        self.small_boards[board_idx][row][col] = self.current_turn
-        sb_win = self.check_small_board_win(board_idx)
-        if sb_win: self.board_states[board_idx] = sb_win
-        
-        bb_win = self.check_big_board_win()
-        if bb_win:
-            self.winner = bb_win
-            self.game_over = True
-            return True
-            
-        self.current_turn = "O" if self.current_turn == "X" else "X"
-        next_idx = row * 3 + col
-        if self.board_states[next_idx] != "": self.next_board_index = -1
-        else: self.next_board_index = next_idx
-        return True
-
 class Cell:
     def __init__(self, row, col):
         self.row = row
@@ -224,12 +170,22 @@ class GameState:
         self.back_button = None
         
         self.logic = UltimateTicTacToeLogic()
-        self.ai = MinimaxAI(depth=3) 
+        if config.AI_ENGINE == "mcts":
+            self.ai = MCTSAI(exploration=config.AI_MCTS_EXPLORATION)
+        elif config.AI_WORKERS > 1:
+            self.ai = ParallelMinimaxAI(depth=config.AI_MAX_DEPTH, tt_size_mb=config.AI_TT_SIZE_MB, workers=config.AI_WORKERS)
+        else:
+            self.ai = MinimaxAI(depth=config.AI_MAX_DEPTH, tt_size_mb=config.AI_TT_SIZE_MB)
+        if config.AI_LOG_SEARCH:
+            self.ai.on_search = log_search_stats
         self.ai_thinking = False
         self.ai_timer = 0
         self.ai_delay_duration = 0
         self.ai_message = ""
         self.pending_move = None
+        self.ai_task = None
+        # MCTS keeps its tree between moves instead of pondering
+        self.ponderer = Ponderer(self.ai, slice_ms=config.AI_MOVE_TIME_MS) if config.AI_PONDER and isinstance(self.ai, MinimaxAI) else None
         
         # Cells for hover effects
         self.cells = [[Cell(r, c) for c in range(9)] for r in range(9)]
@@ -253,6 +209,19 @@ class GameState:
         self.win_probability = 0.0
         self.lose_probability = 0.0
         self.draw_probability = 0.0
+        self.display_win = 0.0
+        self.display_lose = 0.0
+        self.display_draw = 0.0
+        if config.PROBABILITY_WORKERS > 1:
+            rollout_engine = ParallelProbabilityEngine(cache_mb=config.PROBABILITY_CACHE_MB,
+                                                       workers=config.PROBABILITY_WORKERS)
+        else:
+            rollout_engine = ProbabilityEngine(cache_mb=config.PROBABILITY_CACHE_MB)
+        self.probability_service = ProbabilityService(
+            rollout_engine,
+            tolerance=config.PROBABILITY_TOLERANCE,
+            time_slice_ms=config.PROBABILITY_TIME_SLICE_MS,
+            max_simulations=config.PROBABILITY_MAX_SIMULATIONS)
 
         self.update_dimensions()
         self.x_wins = 0
@@ -312,9 +281,8 @@ class GameState:
         w, h = self.game.screen.get_size()
         self.back_button = UIButton(20, h - 60, 100, 40, "Menu", go_home)
         if params == "new_game" or self.logic.game_over:
+             self.cancel_ai_search()
              self.logic = UltimateTicTacToeLogic() 
-             self.ai_thinking = False
-             self.pending_move = None
              self.x_wins = 0
              self.o_wins = 0 
              # Reset visual states
@@ -338,6 +306,13 @@ class GameState:
              self.display_win = 0.0
              self.display_lose = 0.0
              self.display_draw = 0.0
+             self.probability_service.clear()
+             
+             # Bring up search workers before the clock starts
+             if isinstance(self.ai, ParallelMinimaxAI) and config.GAME_MODE == "computer":
+                 self.ai.start_pool()
+             if isinstance(self.probability_service.engine, ParallelProbabilityEngine):
+                 self.probability_service.engine.start_pool()
              
              # Start timer if time mode is enabled
              if config.GAME_TIME_MODE != "classic":
@@ -345,10 +320,29 @@ class GameState:
              else:
                  game_timer.stop()
 
-    def exit(self): pass
+    def exit(self):
+        # Leaving mid-search (Menu/back): stop the worker, it restarts on resume
+        self.cancel_ai_search()
+
+    def cancel_ai_search(self):
+        if self.ai_task:
+            self.ai_task.cancel()
+            self.ai_task = None
+        if self.ponderer:
+            self.ponderer.stop()
+        self.ai_thinking = False
+        self.pending_move = None
+
+    def get_ai_budget_ms(self):
+        """Thinking time for the AI's next move, capped by the chess clock in timed modes"""
+        budget = config.AI_MOVE_TIME_MS
+        if config.GAME_TIME_MODE != "classic":
+            budget = min(budget, game_timer.get_move_budget_ms(2))
+        return budget
 
     def run_ai_turn(self):
-        move = self.ai.get_best_move(self.logic)
+        deadline = time.perf_counter() + self.get_ai_budget_ms() / 1000
+        move = self.ai.get_best_move(self.logic, deadline)
         if move:
             board_idx, r, c = move
             self.logic.make_move(board_idx, r, c)
@@ -401,6 +395,7 @@ class GameState:
             self.game.timeout_win = True
             
             # End the game
+            self.cancel_ai_search()
             self.logic.game_over = True
             game_timer.stop()
             self.check_game_over()
@@ -463,17 +458,14 @@ class GameState:
                              if config.GAME_TIME_MODE != "classic":
                                  game_timer.switch_turn()
                              
-                             # Evaluate win probability after each valid move
-                             from engine import probability_engine
-                             win, lose, draw = probability_engine.evaluate_win_probabilities(self.logic)
-                             self.win_probability = win
-                             self.lose_probability = lose
-                             self.draw_probability = draw
+                             # Evaluate win probability after each valid move (in the background)
+                             self.probability_service.submit(self.logic)
                              
                              self.check_game_over()
 
     def update(self):
         self.back_button.update()
+        self.update_probabilities()
         
         # Update timer and check for time-based game end
         if config.GAME_TIME_MODE != "classic" and not self.logic.game_over:
@@ -556,9 +548,28 @@ class GameState:
                 msgs = ["Thinking...", "Hmm...", "Analyzing...", "Planning...", "Observing...", "Wait...", "Calculating...", "Interesting...", "Nice move...", "Let me see...", "Tricky...", "Winning...", "You sure?", "I see it..."]
                 self.ai_message = random.choice(msgs)
                 self.ai_delay_duration = random.randint(1500, 3000)
-                self.pending_move = self.ai.get_best_move(self.logic)
-            else:
+                budget_ms = self.get_ai_budget_ms()
+                if config.GAME_TIME_MODE != "classic":
+                    # AI's clock keeps running during the pause, keep it within budget
+                    self.ai_delay_duration = min(self.ai_delay_duration, budget_ms)
+                deadline = time.perf_counter() + budget_ms / 1000
+                ponder_move = self.ponderer.take(self.logic) if self.ponderer else None
+                if ponder_move:
+                    # Ponder hit: the reply was searched on the player's time
+                    self.ai_task = AISearchTask.from_result(self.ai, self.logic, ponder_move)
+                    if config.GAME_TIME_MODE != "classic":
+                        self.ai_delay_duration = min(self.ai_delay_duration, 300)
+                else:
+                    # Search in the background so the frame loop keeps animating
+                    self.ai_task = AISearchTask(self.ai, self.logic, deadline).start()
+            elif self.ai_task and self.ai_task.is_done():
                 if current_time - self.ai_timer > self.ai_delay_duration:
+                    self.pending_move = self.ai_task.poll()
+                    if self.ai_task.failed:
+                        # Searching again would fail the same way every frame, play any legal move
+                        legal_moves = self.logic.get_legal_moves()
+                        self.pending_move = legal_moves[0] if legal_moves else None
+                    self.ai_task = None
                     if self.pending_move:
                         board_idx, r, c = self.pending_move
                         sound.play("move")
@@ -576,14 +587,13 @@ class GameState:
                         if config.GAME_TIME_MODE != "classic":
                             game_timer.switch_turn()
                         
-                        # Evaluate win probability after AI move
-                        from engine import probability_engine
-                        win, lose, draw = probability_engine.evaluate_win_probabilities(self.logic)
-                        self.win_probability = win
-                        self.lose_probability = lose
-                        self.draw_probability = draw
+                        # Evaluate win probability after AI move (in the background)
+                        self.probability_service.submit(self.logic)
                         
                         self.check_game_over()
+                        # Think about the answer to the player's move on their time
+                        if self.ponderer and not self.logic.game_over:
+                            self.ponderer.start(self.logic)
                     self.ai_thinking = False
                     self.pending_move = None
 
@@ -807,6 +817,16 @@ class GameState:
             for col in range(9):
                 self.cells[row][col].draw(surface)
 
+    def update_probabilities(self):
+        """Pick up finished estimates and ease the bar towards them"""
+        estimate = self.probability_service.take_result()
+        if estimate:
+            self.win_probability, self.lose_probability, self.draw_probability = estimate.probabilities
+        ease = 0.15
+        self.display_win += (self.win_probability - self.display_win) * ease
+        self.display_lose += (self.lose_probability - self.display_lose) * ease
+        self.display_draw += (self.draw_probability - self.display_draw) * ease
+
     def draw_probability_bar(self, surface):
         """Draw probability bar graph on the right side, similar to chess evaluation bar"""
         w, h = surface.get_size()
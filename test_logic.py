@@ -0,0 +1,194 @@
+"""
+Test script for the game rules
+Plays random games and checks the invariants the search relies on, and that
+the game's search workers start without pygame.
+"""
+
+import sys
+import os
+import pickle
+import random
+import runpy
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.position import Position
+from engine.process_pool import spawn_pool
+from engine.ultimate_logic import UltimateTicTacToeLogic, random_position
+from engine.zobrist import ZOBRIST_CELLS, ZOBRIST_NEXT, ZOBRIST_SIDE
+
+GAMES = 300
+MAIN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+def snapshot(state):
+    """Every field of the position, for exact comparison."""
+    return (tuple(state.masks[0]), tuple(state.masks[1]), tuple(state.big), state.big_draw,
+            state.closed, state.cell_hash, state.current_turn, state.next_board_index,
+            state.winner, state.game_over, len(state.history))
+
+
+def scratch_key(state):
+    """Zobrist key computed from the cell contents, not the incremental hash."""
+    key = ZOBRIST_NEXT[state.next_board_index + 1]
+    if state.current_turn == "O":
+        key ^= ZOBRIST_SIDE
+    for board_idx in range(9):
+        for cell in range(9):
+            value = state.get_cell(board_idx, cell)
+            if value:
+                key ^= ZOBRIST_CELLS[0 if value == "X" else 1][board_idx][cell]
+    return key
+
+
+def random_games(count=GAMES, seed=0):
+    """Yield (state, move) before every move of count random games."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        state = UltimateTicTacToeLogic()
+        while not state.game_over:
+            move = rng.choice(state.get_legal_moves())
+            yield state, move
+            state.make_move(*move)
+
+
+def test_unmake_restores_state():
+    """make_move followed by unmake_move leaves the position exactly as it was."""
+    moves = 0
+    for state, move in random_games():
+        before = snapshot(state)
+        assert state.make_move(*move)
+        state.unmake_move()
+        assert snapshot(state) == before, f"after {move}"
+        moves += 1
+
+    # Unwinding a whole game gets back to the empty board
+    empty = snapshot(UltimateTicTacToeLogic())
+    rng = random.Random(1)
+    state = UltimateTicTacToeLogic()
+    while not state.game_over:
+        state.make_move(*rng.choice(state.get_legal_moves()))
+    while state.history:
+        state.unmake_move()
+    assert snapshot(state) == empty
+    print(f"make/unmake checked on {moves} moves")
+
+
+def test_zobrist_key():
+    """The incremental key matches a from-scratch hash after make, unmake and set_cell."""
+    for state, move in random_games():
+        assert state.zobrist_key == scratch_key(state)
+        state.make_move(*move)
+        assert state.zobrist_key == scratch_key(state), f"after make {move}"
+        assert state.copy().zobrist_key == state.zobrist_key
+        state.unmake_move()
+        assert state.zobrist_key == scratch_key(state), f"after unmake {move}"
+
+    # Editing cells directly (as the list views and save loading do)
+    rng = random.Random(2)
+    state = UltimateTicTacToeLogic()
+    for _ in range(500):
+        board_idx, cell = rng.randrange(9), rng.randrange(9)
+        state.set_cell(board_idx, cell, rng.choice(("X", "O", "")))
+        assert state.zobrist_key == scratch_key(state)
+    state.small_boards[4][1][1] = "O"
+    assert state.zobrist_key == scratch_key(state)
+
+    # Same position reached by another move order, same key
+    a = UltimateTicTacToeLogic()
+    b = UltimateTicTacToeLogic()
+    for move in [(4, 0, 0), (0, 1, 1), (4, 2, 2), (8, 1, 1)]:
+        assert a.make_move(*move)
+    for move in [(4, 2, 2), (8, 1, 1), (4, 0, 0), (0, 1, 1)]:
+        assert b.make_move(*move)
+    assert a.zobrist_key == b.zobrist_key
+    print("Zobrist keys match from-scratch hashes")
+
+
+def test_position_round_trip():
+    """to_position/from_position and pickling keep the position; equal positions hash alike."""
+    seen = {}
+    for state, move in random_games():
+        state.make_move(*move)
+        position = state.to_position()
+        restored = UltimateTicTacToeLogic.from_position(position)
+        # Everything but the move history survives
+        assert snapshot(restored)[:-1] == snapshot(state)[:-1], f"after {move}"
+        assert restored.zobrist_key == position.key == state.zobrist_key
+        assert restored.to_position() == position
+
+        copy = pickle.loads(pickle.dumps(position))
+        assert copy == position and copy.key == position.key and hash(copy) == hash(position)
+        assert position.side == (0 if state.current_turn == "X" else 1)
+        assert position.next_board_index == state.next_board_index
+        assert (position.big_x, position.big_o, position.big_draw) == (state.big[0], state.big[1], state.big_draw)
+        assert position.x_masks() == state.masks[0] and position.o_masks() == state.masks[1]
+        seen.setdefault(position, position.key)
+        assert seen[position] == position.key
+        state.unmake_move()
+        assert state.to_position() != position
+
+    # Usable as a dict key across move orders; differs by side to move
+    a = UltimateTicTacToeLogic()
+    b = UltimateTicTacToeLogic()
+    for move in [(4, 0, 0), (0, 1, 1), (4, 2, 2), (8, 1, 1)]:
+        assert a.make_move(*move)
+    for move in [(4, 2, 2), (8, 1, 1), (4, 0, 0), (0, 1, 1)]:
+        assert b.make_move(*move)
+    assert {a.to_position(): 1}[b.to_position()] == 1
+    p = a.to_position()
+    other_side = Position.pack(p.x_masks(), p.o_masks(), p.big_x, p.big_o, p.big_draw,
+                               1 - p.side, p.next_board_index, p.key)
+    assert p != other_side and other_side.side != p.side
+    assert p != "not a position"
+
+    try:
+        p.x = 0
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("Position accepted an assignment")
+    print(f"Position round trips checked on {len(seen)} positions")
+
+
+def test_random_position():
+    """random_position stays within the ply range and side asked for, and rejects impossible requests."""
+    rng = random.Random(3)
+    for _ in range(50):
+        state = random_position(rng, 4, 15, side="O")
+        assert not state.game_over and state.current_turn == "O" and 4 <= len(state.history) <= 15
+    assert len(random_position(rng, 6, 6, side="X").history) == 6
+    try:
+        random_position(rng, 6, 6, side="O")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("random_position accepted a side that can't be on move")
+    print("random_position checked")
+
+
+def _worker_modules():
+    # What a worker of the game's pools does: re-run main.py as __mp_main__,
+    # then import the modules its tasks come from
+    runpy.run_path(MAIN_PATH, run_name="__mp_main__")
+    import engine.parallel_rollouts
+    import engine.parallel_search
+    return sorted(name for name in sys.modules if name.split(".")[0] in ("pygame", "states", "ui"))
+
+
+def test_workers_skip_pygame():
+    """A spawned search/rollout worker of the game never loads pygame or the UI states."""
+    with spawn_pool(1) as pool:
+        loaded = pool.submit(_worker_modules).result()
+    assert not loaded, f"worker imported {loaded}"
+    print("Spawned workers run without pygame")
+
+
+if __name__ == "__main__":
+    test_unmake_restores_state()
+    test_zobrist_key()
+    test_position_round_trip()
+    test_random_position()
+    test_workers_skip_pygame()
+    print("All logic tests passed!")
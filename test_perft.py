@@ -0,0 +1,49 @@
+"""
+Test script for move generation
+Checks perft counts against the reference numbers and every move generator
+against the reference rules.
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.perft import GENERATORS, REFERENCE_COUNTS, cross_check, divide, perft, position
+
+
+def test_perft_counts():
+    """Leaf counts of the game logic match the reference numbers."""
+    for name, counts in REFERENCE_COUNTS.items():
+        for depth in range(4):
+            state = position(name)
+            nodes = perft(state, depth)
+            print(f"{name:6s} depth {depth}: {nodes}")
+            assert nodes == counts[depth], f"{name} depth {depth}: {nodes} != {counts[depth]}"
+
+
+def test_generators_agree():
+    """Every generator gives the same counts and the same moves as the reference."""
+    for name in REFERENCE_COUNTS:
+        for gen_name, generator in GENERATORS.items():
+            assert perft(position(name), 3, generator) == REFERENCE_COUNTS[name][3], gen_name
+        mismatches = cross_check(position(name), 2)
+        assert not mismatches, mismatches
+
+
+def test_divide_and_restore():
+    """divide sums to perft and leaves the position as it found it."""
+    state = position("late")
+    before = state.to_position()
+    results = divide(state, 3)
+    assert len(results) == REFERENCE_COUNTS["late"][1]
+    assert sum(nodes for _, nodes in results) == REFERENCE_COUNTS["late"][3]
+    assert state.to_position() == before
+
+
+if __name__ == "__main__":
+    test_perft_counts()
+    test_generators_agree()
+    test_divide_and_restore()
+    print("All perft tests passed!")
@@ -9,8 +9,8 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from states.game import UltimateTicTacToeLogic
-from engine.probability_engine import evaluate_win_probabilities
+from engine.ultimate_logic import UltimateTicTacToeLogic
+from engine.probability_engine import ProbabilityEngine, evaluate_win_probabilities
 
 
 def print_board_state(logic):
@@ -154,10 +154,31 @@ def test_game_over():
     print(f"  Draw: {draw_prob:.1%}")
 
 
+def test_weight_change():
+    """Changing a move weight after evaluating drops the tables built with the old one."""
+    print("\n" + "="*60)
+    print("TEST 5: Changing Move Weights")
+    print("="*60)
+
+    engine = ProbabilityEngine(use_numpy=False, seed=1)
+    logic = UltimateTicTacToeLogic()
+    logic.make_move(4, 0, 0)
+    engine.evaluate_win_probabilities(logic, simulations=100)
+    before = engine._get_board_weights(logic, 0)
+
+    engine.CENTER_WEIGHT = 10.0
+    assert not engine._weight_cache and not len(engine.cache)
+    cells, cumulative = engine._get_board_weights(logic, 0)
+    assert cumulative != before[1]
+    center = cells.index(4)
+    assert abs(cumulative[center] - cumulative[center - 1] - 10.0) < 1e-9
+    print(f"Center cell weight: {before[1][center] - before[1][center - 1]:.1f} -> 10.0")
+
+
 def test_performance():
     """Test performance with different simulation counts."""
     print("\n" + "="*60)
-    print("TEST 5: Performance Comparison")
+    print("TEST 6: Performance Comparison")
     print("="*60)
     
     import time
@@ -192,6 +213,7 @@ if __name__ == "__main__":
     test_mid_game()
     test_winning_position()
     test_game_over()
+    test_weight_change()
     test_performance()
     
     print("\n" + "="*60)
@@ -0,0 +1,100 @@
+"""
+Test script for the engine-vs-engine match runner
+Plays a few quick games and checks the bookkeeping and the Elo arithmetic.
+"""
+
+import sys
+import os
+import math
+import random
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine.ai_minimax import MinimaxAI
+from engine.tournament import MatchResult, elo_difference, game_score, make_player, parse_player, play_game, run_match
+from engine.ultimate_logic import UltimateTicTacToeLogic
+
+
+def test_parse_player():
+    """Player specs split into engine and numeric settings; bad specs are rejected."""
+    assert parse_player("minimax") == ("minimax", {})
+    assert parse_player("minimax:depth=3,two=12") == ("minimax", {"depth": 3, "two": 12})
+    assert parse_player("rollout:threat=3.5") == ("rollout", {"threat": 3.5})
+    for bad in ("alphabeta", "minimax:depth"):
+        try:
+            parse_player(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"{bad} was accepted")
+
+    # Minimax scores go in the transposition table, so its weights must be integers
+    assert make_player("minimax:two=12").weights["two"] == 12
+    try:
+        make_player("minimax:two=12.5")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("fractional minimax weight was accepted")
+
+
+def test_elo():
+    """Elo difference and error bars from win/draw/loss counts."""
+    assert elo_difference(0.5) == 0
+    assert abs(elo_difference(0.75) - 190.85) < 0.01
+    result = MatchResult("a", "b")
+    for game in [(1, 0, 0, 0, 0)] * 60 + [(0.5, 0, 0, 0, 0)] * 10 + [(0, 0, 0, 0, 0)] * 30:
+        result.add(game)
+    assert (result.wins, result.draws, result.losses) == (60, 10, 30)
+    assert abs(result.score - 0.65) < 1e-9
+    print(f"65% over 100 games: Elo {result.elo():+.0f} +/- {result.elo_error():.0f}")
+    assert 90 < result.elo() < 120 and 50 < result.elo_error() < 90
+    assert math.isinf(MatchResult("a", "b").elo_error())
+
+
+def test_minimax_plays_x():
+    """MinimaxAI captures a small board when it can, playing X as well as O."""
+    state = UltimateTicTacToeLogic()
+    # X gets two in a row on the top of board 4, O keeps sending X back there
+    for move in [(4, 0, 0), (0, 1, 1), (4, 0, 1), (1, 1, 1)]:
+        assert state.make_move(*move)
+    assert state.current_turn == "X" and state.next_board_index == 4
+    assert MinimaxAI(depth=2).get_best_move(state) == (4, 0, 2)
+
+
+def test_draw():
+    """A drawn game counts as a draw for both players."""
+    rng = random.Random(0)
+    while True:
+        state = UltimateTicTacToeLogic()
+        while not state.game_over:
+            state.make_move(*rng.choice(state.get_legal_moves()))
+        if state.winner == "D":
+            break
+    assert game_score(state, "X") == 0.5 and game_score(state, "O") == 0.5
+
+    # Depth-1 self-play from this seed's opening ends drawn
+    game = play_game("minimax:depth=1,tt_mb=1", "minimax:depth=1,tt_mb=1", True, seed=8)
+    assert game[0] == 0.5
+    result = MatchResult("a", "b")
+    result.add(game)
+    assert (result.wins, result.draws, result.losses) == (0, 1, 0)
+
+
+def test_match():
+    """Games alternate colours and every game is counted."""
+    a_as_x = play_game("minimax:depth=2", "minimax:depth=1", True, seed=3)
+    a_as_o = play_game("minimax:depth=2", "minimax:depth=1", False, seed=3)
+    assert a_as_x[2] in (a_as_x[4], a_as_x[4] + 1) and a_as_o[4] in (a_as_o[2], a_as_o[2] + 1)
+    result = run_match("minimax:depth=2", "minimax:depth=1", games=6, workers=1)
+    print(result.summary())
+    assert result.games == 6 and result.moves_a > 0 and result.moves_b > 0
+
+
+if __name__ == "__main__":
+    test_parse_player()
+    test_elo()
+    test_minimax_plays_x()
+    test_draw()
+    test_match()
+    print("All tournament tests passed!")